@@ -12,9 +12,15 @@ require("nonebot_plugin_localstore")
 require("nonebot_plugin_orm")
 require("nonebot_plugin_saa")
 
+from . import cleanup  # noqa: E402
 from . import trigger  # noqa: E402
 from .models import Rss  # noqa: E402
+from .pool import parse_pool  # noqa: E402
 from .config import ELFConfig  # noqa: E402
+from .http import http_client  # noqa: E402
+from .stats import add_stats_job  # noqa: E402
+from .websub import websub_subscriber  # noqa: E402
+from .models.buffer import meta_buffer, add_flush_job  # noqa: E402
 
 VERSION = "3.0.0-alpha.1"
 
@@ -30,6 +36,8 @@ __plugin_meta__ = PluginMetadata(
 )
 
 driver: Driver = get_driver()
+# WebSub 回调路由
+websub_subscriber.setup(driver)
 
 
 @driver.on_startup
@@ -38,9 +46,30 @@ async def startup():
     if not rss_list:
         message = "首次启动，目前没有订阅，请添加！\n另外，请检查配置文件的内容（详见部署教程）！"
         logger.info(repr(message))
+    # 数据库清理任务
+    cleanup.add_cleanup_jobs()
+    # 元数据延迟写入任务
+    add_flush_job()
+    # 运行统计输出任务
+    add_stats_job()
+    # HTTP 客户端
+    http_client.start()
+    # 订阅源解析池
+    parse_pool.start()
+    # 订阅检查调度器
+    trigger.scheduler.start()
     logger.success("ELF_RSS 订阅器启动成功！")
 
 
+@driver.on_shutdown
+async def shutdown():
+    await trigger.scheduler.stop()
+    parse_pool.shutdown()
+    await http_client.close()
+    # 写入尚未保存的元数据
+    await meta_buffer.flush()
+
+
 @driver.on_bot_connect
 async def bot_connect(bot: Bot):
     rss_list = await Rss.get_rss_list(bot.self_id)
@@ -50,7 +79,8 @@ async def bot_connect(bot: Bot):
     else:
         for rss in rss_list:
             # 创建定时任务
-            asyncio.create_task(trigger.add_job(rss)) if not rss.stop else None
+            # 未到期的订阅按上次保存的时间恢复调度
+            asyncio.create_task(trigger.add_job(rss, resume=True)) if not rss.stop else None
         logger.success(f"已为 Bot {bot.self_id} 添加 RSS 更新定时任务！")
 
 
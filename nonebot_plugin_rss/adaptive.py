@@ -0,0 +1,94 @@
+import time
+from typing import List, Optional
+
+from nonebot.log import logger
+
+from .scheduler import is_cron
+from .utils import to_timestamp
+from .config import plugin_config
+from .models import Rss, FeedParser
+from .parser.utils import get_time
+
+HISTORY_SIZE = 20
+"""
+估计更新频率时使用的最近条目数量
+"""
+SMOOTHING = 0.3
+"""
+更新频率指数平滑系数，越大越偏向最近一次观测
+"""
+CHECKS_PER_UPDATE = 2
+"""
+平均每次更新之间的检查次数
+"""
+
+
+def get_history(model: FeedParser) -> List[float]:
+    """
+    获取最近条目的发布时间戳，按时间升序
+
+    没有发布时间的条目无法反映更新频率，不计入
+    """
+    times = sorted(get_time(entry).timestamp() for entry in model.entries if entry.published)
+    return times[-HISTORY_SIZE:]
+
+
+def estimate_rate(rss: Rss, model: Optional[FeedParser], now: float) -> Optional[float]:
+    """
+    估计订阅的更新频率，单位 条/小时
+
+    首次估计使用最近条目的发布间隔，此后根据两次检查之间新发布的条目数量进行指数平滑；
+    订阅源未更新时视为观测到零条新内容
+
+    参数:
+        rss: 订阅实例
+        model: 本次抓取结果，订阅源未更新时为 None
+        now: 本次检查时间戳
+    """
+    history = get_history(model) if model else []
+    # 从最早的条目到现在的平均发布频率，订阅源停更后会逐渐降低
+    history_rate = (len(history) - 1) / (now - history[0]) * 3600 if len(history) > 1 and now > history[0] else None
+    if rss.update_rate is None:
+        return history_rate
+    if rss.last_check is None:
+        return rss.update_rate
+    since = to_timestamp(rss.last_check)
+    if now <= since:
+        return rss.update_rate
+    new_count = sum(1 for timestamp in history if since < timestamp <= now)
+    observed_rate = new_count / (now - since) * 3600
+    return rss.update_rate + SMOOTHING * (observed_rate - rss.update_rate)
+
+
+def get_interval(rate: Optional[float], ttl: Optional[int]) -> int:
+    """
+    根据更新频率计算检查间隔，单位秒
+
+    结果不小于订阅源声明的 ttl，并限制在 `rss_adaptive_min_interval` 与 `rss_adaptive_max_interval` 之间
+    """
+    min_interval = plugin_config.rss_adaptive_min_interval * 60
+    max_interval = max(plugin_config.rss_adaptive_max_interval * 60, min_interval)
+    interval = 3600 / rate / CHECKS_PER_UPDATE if rate else max_interval
+    if ttl:
+        interval = max(interval, ttl * 60)
+    interval = min(max(interval, min_interval), max_interval)
+    # 按分钟取整，避免间隔频繁变动
+    return max(int(round(interval / 60)) * 60, 60)
+
+
+def update_interval(rss: Rss, model: Optional[FeedParser]) -> None:
+    """
+    根据本次检查结果更新订阅的更新频率与自动调整后的检查间隔
+
+    仅在开启自动调整且按固定间隔检查的订阅上学习，学习结果随订阅元数据保存，由调度器使用
+    """
+    if not rss.adaptive or is_cron(rss.time):
+        return
+    rate = estimate_rate(rss, model, time.time())
+    if rate is None:
+        return
+    ttl = model.feed.ttl if model else None
+    interval = get_interval(rate, ttl)
+    if interval != rss.learned_interval:
+        logger.debug(f"{rss.name} 更新频率约 {rate:.2f} 条/小时，检查间隔调整为 {interval // 60} 分钟")
+    rss.set_meta(update_rate=rate, learned_interval=interval)
@@ -0,0 +1,116 @@
+import time
+from datetime import datetime
+from typing import Dict, Callable, Optional, Awaitable, TypedDict
+
+from nonebot.log import logger
+from nonebot_plugin_apscheduler import scheduler
+from apscheduler.triggers.interval import IntervalTrigger
+
+from .config import plugin_config
+from .models import Entry, EntryCache
+
+PRUNE_MARGIN = 2
+"""
+清理内容记录时保留的数量相对 `rss_num_limit` 的倍数
+"""
+
+
+class CleanupStats(TypedDict):
+    """
+    清理任务运行统计
+    """
+
+    last_run: Optional[datetime]
+    """
+    上次运行时间
+    """
+    duration: float
+    """
+    上次运行耗时，单位秒
+    """
+    deleted: int
+    """
+    上次运行删除的记录数
+    """
+    total_deleted: int
+    """
+    累计删除的记录数
+    """
+
+
+cleanup_stats: Dict[str, CleanupStats] = {}
+"""
+各清理任务的运行统计，以任务 ID 为键
+"""
+
+
+async def prune_entries() -> int:
+    """
+    清理各订阅超出数量限制的内容记录
+
+    按 ID 保留 `PRUNE_MARGIN` 倍于 `rss_num_limit` 的记录：跳过、重复或重新出现的条目也会写入新记录，
+    只保留 `rss_num_limit` 条会挤掉仍在订阅源中的条目，使其被当作新内容再次推送。
+    返回清理的记录数量
+    """
+    if plugin_config.rss_num_limit <= 0:
+        return 0
+    limit = plugin_config.rss_num_limit * PRUNE_MARGIN
+    deleted = 0
+    for rss_id in await Entry.get_overflowed(limit):
+        deleted += await Entry.prune(rss_id, limit, plugin_config.rss_cleanup_batch_size)
+    if deleted:
+        logger.info(f"已清理 {deleted} 条超出数量限制的订阅内容记录")
+    return deleted
+
+
+async def delete_expired_cache() -> int:
+    """
+    清理过期的去重缓存
+
+    返回清理的记录数量
+    """
+    deleted = await EntryCache.delete_expired(plugin_config.rss_cleanup_batch_size)
+    if deleted:
+        logger.info(f"已清理 {deleted} 条过期的去重缓存")
+    return deleted
+
+
+def _with_stats(job_id: str, func: Callable[[], Awaitable[int]]) -> Callable[[], Awaitable[int]]:
+    """
+    记录清理任务的运行耗时与删除数量
+    """
+
+    async def wrapper() -> int:
+        start_time = time.perf_counter()
+        deleted = await func()
+        stats = cleanup_stats.get(job_id)
+        cleanup_stats[job_id] = {
+            "last_run": datetime.now(),
+            "duration": time.perf_counter() - start_time,
+            "deleted": deleted,
+            "total_deleted": (stats["total_deleted"] if stats else 0) + deleted,
+        }
+        logger.debug(f"定时任务 {job_id} 运行完毕，耗时 {cleanup_stats[job_id]['duration']:.2f}s，删除 {deleted} 条")
+        return deleted
+
+    return wrapper
+
+
+def add_cleanup_jobs() -> None:
+    """
+    添加数据库清理定时任务
+    """
+    jobs = {
+        "RSS_CLEANUP_ENTRY": prune_entries,
+        "RSS_CLEANUP_CACHE": delete_expired_cache,
+    }
+    for job_id, func in jobs.items():
+        scheduler.add_job(
+            func=_with_stats(job_id, func),  # 定时任务
+            trigger=IntervalTrigger(minutes=plugin_config.rss_cleanup_interval),  # 触发器
+            id=job_id,  # 任务 ID
+            max_instances=1,  # 最大并发
+            coalesce=True,  # 合并所有错过的 Job
+            replace_existing=True,  # 替换同名任务
+        )
+        logger.debug(f"定时任务 {job_id} 添加成功")
@@ -18,6 +18,7 @@ rss_edit = Alconna(
     Args["name", str],
     Option("url", Args["url", str]),
     Option("time", Args["time", str]),
+    Option("ad", Args["adaptive", Union[bool, int]]),
     Option("stop", Args["stop", Union[bool, int]]),
     Option("proxy", Args["proxy", Union[bool, int]]),
     Option("op", Args["only_pic", Union[bool, int]]),
@@ -42,7 +43,7 @@ edit_cmd: type[AlconnaMatcher] = on_alconna(
 """
 RSS 修改订阅响应器
 
-命令： edit [name] [url | time | stop | proxy | op | ot | cp | dp | tr | ck | wk | bk | ft | cr | mi] [value]
+命令： edit [name] [url | time | ad | stop | proxy | op | ot | cp | dp | tr | ck | wk | bk | ft | cr | mi] [value]
 
 示例： edit abc url /example/abc time 10 tr 1 ft link,title,or mi 10
 
@@ -50,6 +51,7 @@ RSS 修改订阅响应器
     name: 订阅名
     url: 订阅链接
     time: 订阅更新时间
+    ad: 根据更新频率自动调整检查间隔，time 为 cron 表达式时无效
     stop: 是否停止订阅
     proxy: 是否使用代理
     op: 仅发送图片
@@ -75,6 +77,7 @@ RSS 修改订阅响应器
 class EditResult(Duplication):
     url: Optional[str]
     time: Optional[str]
+    adaptive: Union[bool, int, None]
     cookie: Optional[str]
     white_keyword: Optional[str]
     black_keyword: Optional[str]
@@ -104,6 +107,7 @@ def param_set(rss: Rss, result: EditResult) -> Rss:  # noqa: C901
             setattr(rss, param, value)
     # 参数 bool
     for param in {
+        "adaptive",
         "stop",
         "proxy",
         "only_pic",
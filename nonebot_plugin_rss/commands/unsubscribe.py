@@ -10,6 +10,7 @@ from nonebot_plugin_alconna import Match, AlconnaMatcher, on_alconna
 
 from .. import trigger
 from ..models import Rss
+from ..websub import websub_subscriber
 from ..config import plugin_config, nonebot_config
 
 rss_unsub = Alconna("unsub", Args["name?", str], Args["confirm?", str])
@@ -80,7 +81,8 @@ async def unsub_cmd_handle(bot: Bot, name: str, target: PlatformTarget = Depends
         # 删除订阅目标
         await rss.delete_target(target)
         if not rss.targets:
-            # 订阅目标为空时删除订阅
+            # 订阅目标为空时取消推送并删除订阅
+            websub_subscriber.unsubscribe(rss)
             await rss.delete()
         elif not rss.stop:
             # 订阅目标不为空且未停止时重新添加定时任务
@@ -108,7 +110,8 @@ async def unsub_cmd_param_confirm(bot: Bot, confirm: str, target: PlatformTarget
                 # 删除订阅目标
                 await rss.delete_target(target)
                 if not rss.targets:
-                    # 订阅目标为空时删除订阅
+                    # 订阅目标为空时取消推送并删除订阅
+                    websub_subscriber.unsubscribe(rss)
                     await rss.delete()
                 elif not rss.stop:
                     # 订阅目标不为空且未停止时重新添加定时任务
@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from nonebot import get_driver
 from nonebot.config import Config
@@ -10,6 +10,25 @@ from pydantic import Extra, Field, BaseModel, AnyHttpUrl
 data_dir: Path = get_data_dir("nonebot_plugin_rss")
 
 
+class HostLimit(BaseModel):
+    """
+    单个主机的请求限制
+    """
+
+    rate: float = 0
+    """
+    每秒请求数量，小于等于 0 时不限制
+    """
+    burst: int = 1
+    """
+    允许的突发请求数量
+    """
+    concurrency: int = 0
+    """
+    同时进行的请求数量，小于等于 0 时不限制
+    """
+
+
 class ELFConfig(BaseModel, extra=Extra.ignore):
     rss_proxy: Optional[AnyHttpUrl] = None
     """
@@ -23,6 +42,108 @@ class ELFConfig(BaseModel, extra=Extra.ignore):
     """
     RSSHub 备用地址
     """
+    rss_hedge_delay: float = 2
+    """
+    RSSHub 主地址超过该时间未响应时向备用地址发起对冲请求，单位秒
+    """
+    rss_mirror_cooldown: int = 10
+    """
+    RSSHub 地址连续请求失败后暂停使用的时间，单位分钟
+    """
+    rss_check_workers: int = 32
+    """
+    RSS 同时检查更新的最大订阅数量
+    """
+    rss_dispatch_batch_size: int = 100
+    """
+    RSS 调度器每轮派发的最大订阅数量
+    """
+    rss_startup_rate: float = 10
+    """
+    RSS 启动或添加订阅时立即检查的速率，单位个/秒，小于等于 0 时不限制
+    """
+    rss_adaptive_min_interval: int = 5
+    """
+    RSS 自动调整检查间隔的下限，单位分钟
+    """
+    rss_adaptive_max_interval: int = 24 * 60
+    """
+    RSS 自动调整检查间隔的上限，单位分钟
+    """
+    rss_backoff_base: int = 5
+    """
+    RSS 抓取失败后的初始退避时间，单位分钟，之后每次失败翻倍
+    """
+    rss_backoff_max: int = 6 * 60
+    """
+    RSS 抓取失败后的最大退避时间，单位分钟，同时限制 Retry-After 的等待时间
+    """
+    rss_websub_callback_base: Optional[AnyHttpUrl] = None
+    """
+    RSS WebSub 回调地址前缀，即外部访问 NoneBot 的地址，如 `https://bot.example.com`
+
+    设置后对声明了 hub 的订阅源使用 WebSub 推送，需要使用支持服务端的驱动器（如 FastAPI）
+    """
+    rss_websub_lease: int = 10
+    """
+    RSS WebSub 订阅的请求租期，单位天，实际租期由 hub 决定
+    """
+    rss_websub_poll_interval: int = 6 * 60
+    """
+    RSS 已通过 WebSub 推送的订阅的兜底检查间隔，单位分钟，订阅本身的间隔更长时使用订阅的间隔
+    """
+    rss_digest_ignore: List[str] = Field(default_factory=lambda: ["lastBuildDate"])
+    """
+    RSS 计算内容摘要时忽略的元素，内容摘要与上次相同时跳过解析，为空时按原始内容计算
+    """
+    rss_stream_parse: bool = True
+    """
+    RSS 是否使用流式解析，只读取最新的 `rss_num_limit` 个条目，格式错误时改用 feedparser 解析
+    """
+    rss_parse_processes: int = 2
+    """
+    RSS 解析订阅源的工作进程数量，小于等于 0 时使用单个线程，创建进程池失败时使用同样数量的线程
+    """
+    rss_max_body_size: int = 20
+    """
+    RSS 订阅源响应内容的大小上限，单位 MB，小于等于 0 时不限制
+    """
+    rss_http2: bool = True
+    """
+    RSS 是否使用 HTTP/2，需要安装 h2（`pip install httpx[http2]`）
+    """
+    rss_http_max_connections: int = 100
+    """
+    RSS HTTP 客户端的最大连接数
+    """
+    rss_http_max_keepalive: int = 20
+    """
+    RSS HTTP 客户端保持的最大空闲连接数
+    """
+    rss_http_keepalive_expiry: float = 30
+    """
+    RSS HTTP 客户端空闲连接的保持时间，单位秒
+    """
+    rss_dns_cache_ttl: int = 300
+    """
+    RSS DNS 缓存时间，单位秒，为 0 时不缓存
+    """
+    rss_host_limits: Dict[str, HostLimit] = Field(default_factory=dict)
+    """
+    RSS 按主机通配符（如 `*.sinaimg.cn`）配置的请求限制，订阅抓取与图片下载共用，按顺序匹配
+    """
+    rss_host_default_limit: HostLimit = Field(default_factory=lambda: HostLimit(concurrency=10))
+    """
+    RSS 未匹配 `rss_host_limits` 的主机使用的请求限制
+    """
+    rss_fetch_share_ttl: int = 30
+    """
+    RSS 相同订阅地址的抓取结果共享时间，单位秒
+    """
+    rss_meta_flush_interval: int = 60
+    """
+    RSS 订阅元数据（ETag、Last-Modified、失败次数等）批量写入数据库的间隔，单位秒
+    """
     rss_cache_expire: int = 10
     """
     RSS 去重数据库记录过期时间，单位天
@@ -30,6 +151,24 @@ class ELFConfig(BaseModel, extra=Extra.ignore):
     rss_num_limit: int = 200
     """
     RSS 缓存条目数量限制
+
+    每个订阅只检查最新的条目，内容记录保留此数量的两倍，小于等于 0 时不限制
+    """
+    rss_seen_cache_size: int = 200000
+    """
+    RSS 已读内容内存索引的指纹数量上限，每条约占用 70 B，为 0 时不使用索引
+    """
+    rss_cleanup_interval: int = 60
+    """
+    RSS 数据库清理任务执行间隔，单位分钟
+    """
+    rss_cleanup_batch_size: int = 1000
+    """
+    RSS 数据库清理任务每批删除的最大记录数
+    """
+    rss_stats_interval: int = 60
+    """
+    RSS 运行统计（调度队列、解析池、限流等）的日志输出间隔，单位分钟，小于等于 0 时不输出
     """
     rss_length_limit: int = 256
     """
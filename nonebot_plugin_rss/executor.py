@@ -1,23 +1,34 @@
+import re
+import random
+import asyncio
+from hashlib import md5
 from datetime import datetime
-from typing import Any, Dict, Tuple, Optional
+from functools import partial
+from typing import Dict, Tuple, Union, Pattern, Optional
 
-import feedparser
+import httpx
 from yarl import URL
-from nonebot import get_driver
 from nonebot.log import logger
+from cachetools import TTLCache
 from nonebot.adapters import Bot
 from nonebot_plugin_saa import Text
-from nonebot.drivers import Driver, Request, HTTPClientMixin
 
 from . import trigger
 from .parser import ParseRss
+from .pool import parse_pool
 from .config import plugin_config
-from .utils import get_cache_headers
-from .models import Rss, Entry, FeedParser
+from .mirror import mirror_manager
+from .parser.utils import get_time
+from .adaptive import update_interval
+from .websub import websub_subscriber
 from .bot import send, get_bot, send_to_admin
+from .utils import get_retry_after, get_cache_headers
+from .http import ACCEPT_ENCODING, ResponseTooLarge, http_client
+from .models import Rss, Entry, FeedParser, checkpoint, check_session
 
 HEADERS = {
     "Accept": "application/xhtml+xml,application/xml,*/*",
+    "Accept-Encoding": ACCEPT_ENCODING,
     "Accept-Language": "en-US,en;q=0.9",
     "Cache-Control": "max-age=0",
     "User-Agent": (
@@ -35,49 +46,106 @@ async def save_first_time_fetch(rss: Rss, model: FeedParser):
     首次抓取缓存保存
     """
     await Entry.clear(rss.id)
-    for entry in model.entries:
-        await Entry.add(rss.id, entry)
+    # 按时间顺序写入，保证 ID 越大的内容越新，清理时保留最新的内容
+    await Entry.add_all(rss.id, sorted(model.entries, key=get_time))
     logger.info(f"{rss.name} 第一次抓取成功！")
 
 
-async def start(rss: Rss):
+async def start(rss: Rss) -> Optional[float]:
     """
     RSS 检查更新入口
+
+    一次检查更新内的数据库操作共用同一个会话，在检查点与结束时提交
+
+    返回抓取失败时建议的重试等待秒数，成功时返回 None
+    """
+    async with check_session():
+        return await _start(rss)
+
+
+async def handle_push(rss: Rss, content: bytes) -> None:
+    """
+    处理 WebSub 推送的订阅源内容
+
+    由调度器排队执行，与同一订阅的检查更新不会同时进行；
+    推送内容通常只包含新增的条目，直接交由解析流程处理，不影响缓存头与内容摘要
+    """
+    async with check_session():
+        if await get_bot(rss.bot_id) is None:
+            return
+        model, error = await parse_pool.parse(content)
+        if model is None:
+            logger.warning(f"{rss.name} WebSub 推送内容解析失败！")
+            logger.debug(f"{rss.name} {error}")
+            return
+        logger.info(f"{rss.name} 收到 WebSub 推送，共 {len(model.entries)} 条")
+        await ParseRss(rss).start(model)
+
+
+async def _start(rss: Rss) -> Optional[float]:
+    """
+    RSS 检查更新
     """
     bot: Optional[Bot] = await get_bot(rss.bot_id)
     if bot is None:
-        return
+        return None
     # 是否首次抓取
     first_time = rss.last_modified is None and rss.etag is None
-    model, unmodified = await fetch_rss(rss)
-    if unmodified:
+    result = await fetch_rss(rss)
+    if result.unmodified:
         logger.debug(f"{rss.name} 没有新信息")
-        return
+        rss.set_meta(error_count=0)
+        update_interval(rss, None)
+        websub_subscriber.update(rss, None)
+        return None
+    model = result.model
     if not model:
         # 抓取失败
-        rss.error_count += 1
+        rss.set_meta(error_count=rss.error_count + 1)
         logger.warning(f"{rss.name} 抓取失败！")
-        if first_time:
+        # 限流或暂时不可用时不视为订阅地址错误，按退避重试
+        if first_time and not result.rate_limited:
             if plugin_config.rss_proxy and not rss.proxy:
                 rss.proxy = True
                 logger.info(f"{rss.name} 第一次抓取失败，自动使用代理抓取")
-                await start(rss)
+                return await _start(rss)
             else:
                 await stop_and_notify(rss, bot)
+                return None
         if rss.error_count >= 100:
             await stop_and_notify(rss, bot)
-        return
-    if rss.error_count > 0:
-        # 重置错误计数
-        rss.error_count = 0
+            return None
+        return get_backoff(rss.error_count, result.retry_after)
+    # 重置错误计数
+    rss.set_meta(error_count=0)
+    update_interval(rss, model)
+    websub_subscriber.update(rss, model.feed)
     if first_time:
         # 首次抓取处理
         await save_first_time_fetch(rss, model)
-        rss.last_modified = datetime.now().strftime("%a, %d %b %Y %H:%M:%S GMT")
-        rss = await rss.update()
-        return
-    parser = ParseRss(rss)
-    await parser.start(model)
+        rss.set_meta(last_modified=datetime.now().strftime("%a, %d %b %Y %H:%M:%S GMT"))
+    else:
+        parser = ParseRss(rss)
+        await parser.start(model)
+    # 处理完成后再记录内容摘要，处理中断时下次仍会重新解析
+    rss.set_meta(digest=result.digest)
+    return None
+
+
+def get_backoff(error_count: int, retry_after: Optional[float] = None) -> float:
+    """
+    计算抓取失败后的重试等待秒数
+
+    从 `rss_backoff_base` 开始随连续失败次数指数增长，上限为 `rss_backoff_max`，
+    并在一半到全部之间随机抖动，避免同时失败的订阅同时重试；
+    服务端要求的 Retry-After 作为下限，同样受上限约束
+    """
+    max_delay = plugin_config.rss_backoff_max * 60
+    delay = min(plugin_config.rss_backoff_base * 60 * 2 ** min(max(error_count - 1, 0), 32), max_delay)
+    delay *= random.uniform(0.5, 1)
+    if retry_after:
+        delay = max(delay, min(retry_after, max_delay))
+    return delay
 
 
 async def stop_and_notify(rss: Rss, bot: Bot) -> None:
@@ -86,6 +154,8 @@ async def stop_and_notify(rss: Rss, bot: Bot) -> None:
     """
     rss.stop = True
     await rss.update()
+    # 发送通知前提交，避免发送期间占用数据库写锁
+    await checkpoint()
     trigger.delete_job(rss)
     if not rss.targets:
         text = f"Bot {bot.self_id} ({bot.adapter.get_name()}) 的 {rss.name}[{rss.get_url()}] 无人订阅！已自动停止更新！"
@@ -105,7 +175,104 @@ async def stop_and_notify(rss: Rss, bot: Bot) -> None:
         await send(bot_id=bot.self_id, targets=rss.get_targets(), message=Text(text))
 
 
-async def fetch_rss(rss: Rss) -> Tuple[Optional[FeedParser], bool]:
+Validators = Dict[str, Tuple[Optional[str], Optional[str]]]
+"""
+请求地址到 ETag 与 Last-Modified 的映射，直接请求订阅地址时键为空字符串，
+使用备用 RSSHub 时键为各 RSSHub 地址
+"""
+
+
+class FetchResult:
+    """
+    订阅源抓取结果
+
+    相同订阅地址的抓取共享同一个结果，各订阅再分别进行后续处理
+    """
+
+    def __init__(
+        self,
+        model: Optional[FeedParser] = None,
+        unmodified: bool = False,
+        validators: Optional[Validators] = None,
+        known_digest: Optional[str] = None,
+        cache_headers: Optional[Dict[str, Optional[str]]] = None,
+        digest: Optional[str] = None,
+        base: str = "",
+        retry_after: Optional[float] = None,
+        rate_limited: bool = False,
+    ):
+        self.model: Optional[FeedParser] = model
+        """
+        解析结果，抓取或解析失败时为 None
+        """
+        self.unmodified: bool = unmodified
+        """
+        订阅源是否未更新
+        """
+        self.validators: Validators = validators or {}
+        """
+        请求时携带的 ETag 与 Last-Modified
+        """
+        self.known_digest: Optional[str] = known_digest
+        """
+        请求时已知的响应内容摘要
+        """
+        self.cache_headers: Optional[Dict[str, Optional[str]]] = cache_headers
+        """
+        响应中的缓存相关头，抓取或解析失败时为 None
+        """
+        self.digest: Optional[str] = digest
+        """
+        响应内容摘要，未获取到响应内容时为 None
+        """
+        self.base: str = base
+        """
+        返回响应的 RSSHub 地址，直接请求订阅地址时为空字符串
+        """
+        self.retry_after: Optional[float] = retry_after
+        """
+        服务端限流或暂时不可用时要求的等待秒数
+        """
+        self.rate_limited: bool = rate_limited
+        """
+        服务端是否返回了限流或暂时不可用（429 或 503）
+        """
+
+    def usable(self, validators: Validators, known_digest: Optional[str]) -> bool:
+        """
+        判断结果能否被携带指定缓存头与内容摘要的订阅复用
+
+        未更新的结果只对携带相同缓存头与内容摘要的订阅有效
+        """
+        return not self.unmodified or (self.validators == validators and self.known_digest == known_digest)
+
+
+_VOLATILE: Optional[Pattern[bytes]] = (
+    re.compile(
+        rb"<(%s)\b[^>]*>.*?</\1\s*>" % b"|".join(re.escape(tag.encode()) for tag in plugin_config.rss_digest_ignore),
+        flags=re.DOTALL,
+    )
+    if plugin_config.rss_digest_ignore
+    else None
+)
+"""
+计算内容摘要时移除的易变元素
+"""
+
+
+FetchKey = Tuple[str, Optional[str], Optional[str]]
+
+_fetching: Dict[FetchKey, "asyncio.Task[FetchResult]"] = {}
+"""
+正在进行的抓取任务
+"""
+_fetched: TTLCache = TTLCache(maxsize=1024, ttl=plugin_config.rss_fetch_share_ttl)
+"""
+近期完成的抓取结果
+"""
+
+
+async def fetch_rss(rss: Rss) -> FetchResult:
     """
     获取 RSS 并解析为模型
     """
@@ -115,66 +282,169 @@ async def fetch_rss(rss: Rss) -> Tuple[Optional[FeedParser], bool]:
     use_proxy = rss.proxy if URL(url).host not in localhost else None
     proxy = plugin_config.rss_proxy if use_proxy else None
     cookies = rss.cookie or None
-    headers = HEADERS.copy()
-    unmodified = False
-    if not plugin_config.rsshub_backup:
-        if rss.etag:
-            headers["If-None-Match"] = rss.etag
-        if rss.last_modified:
-            headers["If-Modified-Since"] = rss.last_modified
-    driver: Driver = get_driver()
-    assert isinstance(driver, HTTPClientMixin)
-    headers.update({"Cookie": cookies}) if cookies else None
-    request = Request("GET", url, headers=headers, proxy=proxy, timeout=10)
+    if use_mirrors(rss):
+        # 各 RSSHub 地址分别使用自己的条件请求
+        validators: Validators = {base: (value[0], value[1]) for base, value in rss.validators.items()}
+    else:
+        validators = {"": (rss.etag, rss.last_modified)}
+    result = await fetch_shared(
+        rss, url=url, proxy=proxy, cookies=cookies, validators=validators, known_digest=rss.digest
+    )
+    if result.cache_headers is not None:
+        etag, last_modified = result.cache_headers["ETag"], result.cache_headers["Last-Modified"]
+        if result.base:
+            rss.set_meta(validators={**rss.validators, result.base: [etag, last_modified]})
+        else:
+            rss.set_meta(etag=etag, last_modified=last_modified)
+    if result.unmodified or (result.digest and result.digest == rss.digest):
+        return FetchResult(unmodified=True)
+    # 解析结果由多个订阅共享，后续处理会修改条目，因此复制一份
+    model = result.model.copy(deep=True) if result.model else None
+    return FetchResult(
+        model=model, digest=result.digest, retry_after=result.retry_after, rate_limited=result.rate_limited
+    )
+
+
+async def fetch_shared(
+    rss: Rss,
+    url: str,
+    proxy: Optional[str],
+    cookies: Optional[str],
+    validators: Validators,
+    known_digest: Optional[str],
+) -> FetchResult:
+    """
+    合并相同订阅地址的抓取
+
+    以订阅地址、代理与 cookies 作为键，并发的抓取共享同一个请求，
+    近期完成的结果在 `rss_fetch_share_ttl` 秒内可被直接复用
+    """
+    key: FetchKey = (url, str(proxy) if proxy else None, cookies)
+    result: Optional[FetchResult] = _fetched.get(key)
+    if result is not None and result.usable(validators, known_digest):
+        logger.debug(f"[{url}] 复用近期的抓取结果")
+        return result
+    if (task := _fetching.get(key)) is not None:
+        # 等待正在进行的抓取，发起抓取的订阅超时取消时不影响其他订阅
+        result = await asyncio.shield(task)
+        if result.usable(validators, known_digest):
+            logger.debug(f"[{url}] 复用正在进行的抓取结果")
+            return result
+        # 缓存头不一致时单独抓取
+        return await _fetch(
+            rss, url=url, proxy=proxy, cookies=cookies, validators=validators, known_digest=known_digest
+        )
+    task = asyncio.create_task(
+        _fetch(rss, url=url, proxy=proxy, cookies=cookies, validators=validators, known_digest=known_digest)
+    )
+    _fetching[key] = task
+    task.add_done_callback(partial(_fetch_done, key))
+    return await asyncio.shield(task)
+
+
+def _fetch_done(key: FetchKey, task: "asyncio.Task[FetchResult]") -> None:
+    """
+    抓取完成后移出进行中的任务并缓存结果
+    """
+    if _fetching.get(key) is task:
+        del _fetching[key]
+    if not task.cancelled() and task.exception() is None:
+        _fetched[key] = task.result()
+
+
+async def _fetch(
+    rss: Rss,
+    url: str,
+    proxy: Optional[str],
+    cookies: Optional[str],
+    validators: Validators,
+    known_digest: Optional[str],
+) -> FetchResult:
+    """
+    抓取订阅源并解析为模型
+    """
+    result = FetchResult(validators=validators, known_digest=known_digest)
+
+    async def send(base: str) -> httpx.Response:
+        return await http_client.request(
+            "GET",
+            rss.get_url(base) if base else url,
+            headers=get_headers(validators.get(base, (None, None)), cookies),
+            proxy=proxy,
+            max_size=plugin_config.rss_max_body_size * 1024 * 1024,
+        )
+
     try:
-        response = await driver.request(request)
-        if not plugin_config.rsshub_backup:
-            http_caching_headers = get_cache_headers(response.headers)
-            rss.etag = http_caching_headers["ETag"]
-            rss.last_modified = http_caching_headers["Last-Modified"]
-            await rss.update()
-        if (
-            response.status_code == 200 and int(response.headers.get("Content-Length", "1")) == 0
-        ) or response.status_code == 304:
-            unmodified = True
-            return None, unmodified
-        data = feedparser.parse(response.content)
-        try:
-            model = FeedParser.parse_obj(data)
-        except Exception as e:
-            logger.debug(f"[{url}] 解析失败！{repr(e)}")
-            model = None
-    except Exception as e:
-        if not URL(rss.url).scheme and plugin_config.rsshub_backup:
-            logger.debug(f"[{url}] 访问失败！将使用备用 RSSHub 地址！")
-            data = await fetch_rss_backup(rss, driver=driver, proxy=proxy, cookies=cookies, headers=headers)
-            try:
-                model = FeedParser.parse_obj(data)
-            except Exception as ee:
-                logger.debug(f"[{url}] 解析失败！{repr(ee)}")
-                model = None
+        if use_mirrors(rss):
+            # RSSHub 路由，主地址响应慢或失败时向备用地址发起对冲请求
+            result.base, response = await mirror_manager.request(send)
         else:
-            logger.error(f"[{url}] 访问失败！")
-            logger.debug(f"[{url}] {e}")
-            model = None
-    return model, unmodified
-
-
-async def fetch_rss_backup(rss: Rss, driver: HTTPClientMixin, proxy, cookies, headers) -> Dict[str, Any]:
-    """
-    获取备用 RSS 订阅源数据
-    """
-    data = {}
-    for rsshub in plugin_config.rsshub_backup:
-        rss_url = rss.get_url(rsshub)
-        request = Request("GET", rss_url, cookies=cookies, headers=headers, proxy=proxy, timeout=10)
-        try:
-            response = await driver.request(request)
-            data = feedparser.parse(response.content)
-            if data.get("feed"):
-                logger.info(f"[{rss_url}] 抓取成功！")
-                break
-        except Exception:
-            logger.debug(f"[{rss_url}] 访问失败！将使用备用 RSSHub 地址！")
-            continue
-    return data
+            response = await send("")
+    except ResponseTooLarge as e:
+        logger.error(f"[{url}] 访问失败！{e}")
+        return result
+    except Exception as e:
+        logger.error(f"[{url}] 访问失败！")
+        logger.debug(f"[{url}] {e}")
+        return result
+    if (
+        response.status_code == 200 and int(response.headers.get("Content-Length", "1")) == 0
+    ) or response.status_code == 304:
+        result.unmodified = True
+        result.cache_headers = get_cache_headers(response.headers)
+        return result
+    if response.status_code in {429, 503}:
+        # 限流或暂时不可用，按 Retry-After 退避
+        result.rate_limited = True
+        result.retry_after = get_retry_after(response.headers)
+        logger.warning(f"[{url}] 服务端返回 {response.status_code}，稍后重试")
+        return result
+    result.digest = get_digest(response.content)
+    if result.digest == known_digest:
+        # 内容与上次相同，跳过解析
+        result.unmodified = True
+        result.cache_headers = get_cache_headers(response.headers)
+        return result
+    result.model, error = await parse_pool.parse(response.content)
+    if result.model is None:
+        logger.debug(f"[{url}] 解析失败！{error}")
+        return result
+    # 仅在成功解析后保存缓存头，避免错误页面的缓存头导致之后的请求被误判为未更新
+    result.cache_headers = get_cache_headers(response.headers)
+    return result
+
+
+def get_headers(validators: Tuple[Optional[str], Optional[str]], cookies: Optional[str]) -> Dict[str, str]:
+    """
+    获取抓取订阅源的请求头，携带条件请求头与 cookies
+    """
+    headers = HEADERS.copy()
+    etag, last_modified = validators
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    if cookies:
+        headers["Cookie"] = cookies
+    return headers
+
+
+def get_digest(content: Union[str, bytes, None]) -> str:
+    """
+    计算响应内容摘要
+
+    计算前移除 `rss_digest_ignore` 中的易变元素，如每次生成都会变化的 lastBuildDate
+    """
+    if isinstance(content, str):
+        content = content.encode()
+    content = content or b""
+    if _VOLATILE is not None:
+        content = _VOLATILE.sub(b"", content)
+    return md5(content).hexdigest()
+
+
+def use_mirrors(rss: Rss) -> bool:
+    """
+    订阅是否通过 RSSHub 主地址与备用地址抓取
+    """
+    return not URL(rss.url).scheme and bool(plugin_config.rsshub_backup)
@@ -0,0 +1,315 @@
+import time
+import socket
+import asyncio
+from importlib.util import find_spec
+from contextlib import contextmanager
+from typing import Any, Dict, List, Type, Tuple, Iterable, Optional, Generator, AsyncIterable, AsyncIterator
+
+import httpx
+import httpcore
+from nonebot.log import logger
+
+from .utils import convert_size
+from .config import plugin_config
+from .limiter import host_limiter
+
+HTTP2_AVAILABLE = find_spec("h2") is not None
+"""
+是否安装了 HTTP/2 依赖 h2
+"""
+ACCEPT_ENCODING = "gzip, deflate, br" if find_spec("brotli") or find_spec("brotlicffi") else "gzip, deflate"
+"""
+支持解压的压缩格式，安装了 brotli 时支持 br
+"""
+
+
+HTTPCORE_EXCEPTIONS: Dict[type, Type[httpx.TransportError]] = {
+    httpcore.TimeoutException: httpx.TimeoutException,
+    httpcore.ConnectTimeout: httpx.ConnectTimeout,
+    httpcore.ReadTimeout: httpx.ReadTimeout,
+    httpcore.WriteTimeout: httpx.WriteTimeout,
+    httpcore.PoolTimeout: httpx.PoolTimeout,
+    httpcore.NetworkError: httpx.NetworkError,
+    httpcore.ConnectError: httpx.ConnectError,
+    httpcore.ReadError: httpx.ReadError,
+    httpcore.WriteError: httpx.WriteError,
+    httpcore.ProxyError: httpx.ProxyError,
+    httpcore.UnsupportedProtocol: httpx.UnsupportedProtocol,
+    httpcore.ProtocolError: httpx.ProtocolError,
+    httpcore.LocalProtocolError: httpx.LocalProtocolError,
+    httpcore.RemoteProtocolError: httpx.RemoteProtocolError,
+}
+"""
+httpcore 异常与 httpx 异常的对应关系
+"""
+DECODED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+"""
+读取并解压响应内容后不再适用的响应头
+"""
+
+
+class ResponseTooLarge(Exception):
+    """
+    响应内容超过大小限制
+    """
+
+
+class CachedDNSBackend(httpcore.AsyncNetworkBackend):
+    """
+    带 DNS 缓存的网络后端
+
+    在建立 TCP 连接前解析并缓存域名，缓存 `ttl` 秒；依次尝试解析到的地址，
+    全部连接失败时清除缓存，下次重新解析。TLS 握手仍使用原域名，不影响证书校验
+    """
+
+    def __init__(
+        self, backend: httpcore.AsyncNetworkBackend, cache: Dict[Tuple[str, int], Tuple[float, List[str]]], ttl: float
+    ):
+        self._backend: httpcore.AsyncNetworkBackend = backend
+        self._cache: Dict[Tuple[str, int], Tuple[float, List[str]]] = cache
+        self.ttl: float = ttl
+        """
+        DNS 缓存时间，单位秒
+        """
+
+    async def _resolve(self, host: str, port: int) -> List[str]:
+        try:
+            socket.inet_pton(socket.AF_INET6 if ":" in host else socket.AF_INET, host)
+            return [host]
+        except OSError:
+            pass
+        cached = self._cache.get((host, port))
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys(str(info[4][0]) for info in infos))
+        self._cache[(host, port)] = (time.monotonic() + self.ttl, addresses)
+        return addresses
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: Optional[float] = None,
+        local_address: Optional[str] = None,
+        socket_options: Optional[Iterable[Any]] = None,
+    ) -> httpcore.AsyncNetworkStream:
+        try:
+            addresses = await self._resolve(host, port)
+        except OSError as e:
+            raise httpcore.ConnectError(str(e)) from e
+        last_error: Optional[Exception] = None
+        for address in addresses:
+            try:
+                return await self._backend.connect_tcp(address, port, timeout, local_address, socket_options)
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                last_error = e
+        self._cache.pop((host, port), None)
+        assert last_error is not None
+        raise last_error
+
+    async def connect_unix_socket(
+        self,
+        path: str,
+        timeout: Optional[float] = None,
+        socket_options: Optional[Iterable[Any]] = None,
+    ) -> httpcore.AsyncNetworkStream:
+        return await self._backend.connect_unix_socket(path, timeout, socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+class CachedDNSTransport(httpx.AsyncBaseTransport):
+    """
+    使用带 DNS 缓存的 httpcore 连接池的传输层
+
+    httpx 的默认传输层不支持指定网络后端，因此直接包装以 `network_backend` 创建的连接池
+    """
+
+    def __init__(self, pool: httpcore.AsyncConnectionPool):
+        self._pool: httpcore.AsyncConnectionPool = pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        assert isinstance(request.stream, httpx.AsyncByteStream)
+        core_request = httpcore.Request(
+            method=request.method,
+            url=httpcore.URL(
+                scheme=request.url.raw_scheme,
+                host=request.url.raw_host,
+                port=request.url.port,
+                target=request.url.raw_path,
+            ),
+            headers=request.headers.raw,
+            content=request.stream,
+            extensions=request.extensions,
+        )
+        with map_httpcore_exceptions(request):
+            response = await self._pool.handle_async_request(core_request)
+        assert isinstance(response.stream, AsyncIterable)
+        return httpx.Response(
+            status_code=response.status,
+            headers=response.headers,
+            stream=CoreResponseStream(response.stream, request),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._pool.aclose()
+
+
+class CoreResponseStream(httpx.AsyncByteStream):
+    """
+    httpcore 响应内容流，转换其中抛出的异常
+    """
+
+    def __init__(self, stream: AsyncIterable[bytes], request: httpx.Request):
+        self._stream: AsyncIterable[bytes] = stream
+        self._request: httpx.Request = request
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        with map_httpcore_exceptions(self._request):
+            async for chunk in self._stream:
+                yield chunk
+
+    async def aclose(self) -> None:
+        if hasattr(self._stream, "aclose"):
+            await self._stream.aclose()  # type: ignore
+
+
+@contextmanager
+def map_httpcore_exceptions(request: httpx.Request) -> Generator[None, None, None]:
+    """
+    将 httpcore 的异常转换为对应的 httpx 异常，与 httpx 默认传输层的行为一致
+    """
+    try:
+        yield
+    except Exception as e:
+        # 按继承顺序查找最具体的对应异常
+        for exc_type in type(e).__mro__:
+            if exc_type in HTTPCORE_EXCEPTIONS:
+                raise HTTPCORE_EXCEPTIONS[exc_type](str(e), request=request) from e
+        raise
+
+
+class HTTPClient:
+    """
+    插件的 HTTP 客户端
+
+    订阅抓取与图片下载共用，按代理地址分别维护连接池，同一主机的请求复用长连接，
+    安装了 h2 时对支持的主机使用 HTTP/2 多路复用；请求受主机限流器约束
+    """
+
+    def __init__(self):
+        self._clients: Dict[Optional[str], httpx.AsyncClient] = {}
+        self._dns_cache: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+
+    def _create_client(self, proxy: Optional[str]) -> httpx.AsyncClient:
+        http2 = plugin_config.rss_http2 and HTTP2_AVAILABLE
+        limits = {
+            "max_connections": plugin_config.rss_http_max_connections,
+            "max_keepalive_connections": plugin_config.rss_http_max_keepalive,
+            "keepalive_expiry": plugin_config.rss_http_keepalive_expiry,
+        }
+        transport: httpx.AsyncBaseTransport
+        if proxy is None and plugin_config.rss_dns_cache_ttl > 0:
+            # 直连时使用带 DNS 缓存的网络后端，使用代理时目标域名由代理解析
+            backend = CachedDNSBackend(httpcore.AnyIOBackend(), self._dns_cache, plugin_config.rss_dns_cache_ttl)
+            pool = httpcore.AsyncConnectionPool(
+                ssl_context=httpx.create_ssl_context(), http2=http2, network_backend=backend, **limits
+            )
+            transport = CachedDNSTransport(pool)
+        else:
+            transport = httpx.AsyncHTTPTransport(http2=http2, limits=httpx.Limits(**limits), proxy=proxy)
+        return httpx.AsyncClient(transport=transport, follow_redirects=True)
+
+    def get_client(self, proxy: Optional[str] = None) -> httpx.AsyncClient:
+        """
+        获取使用指定代理的客户端，不存在时创建
+        """
+        if (client := self._clients.get(proxy)) is None or client.is_closed:
+            client = self._clients[proxy] = self._create_client(proxy)
+        return client
+
+    def start(self) -> None:
+        """
+        创建直连客户端
+        """
+        self.get_client()
+        logger.debug(f"HTTP 客户端已创建，HTTP/2：{'开启' if plugin_config.rss_http2 and HTTP2_AVAILABLE else '关闭'}")
+
+    async def close(self) -> None:
+        """
+        关闭所有客户端与连接
+        """
+        clients, self._clients = list(self._clients.values()), {}
+        await asyncio.gather(*(client.aclose() for client in clients), return_exceptions=True)
+        self._dns_cache.clear()
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        proxy: Optional[str] = None,
+        timeout: float = 10,
+        max_size: int = 0,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """
+        发送请求
+
+        参数:
+            method: 请求方法
+            url: 请求地址
+            proxy: 代理地址
+            timeout: 超时时间，单位秒
+            max_size: 解压后的响应内容大小上限，单位字节，小于等于 0 时不限制，超过时抛出 `ResponseTooLarge`
+            kwargs: 其余参数，同 `httpx.AsyncClient.request`
+
+        返回已读取并解压内容的响应
+        """
+        client = self.get_client(str(proxy) if proxy else None)
+        async with host_limiter.limit(url):
+            request = client.build_request(method, url, timeout=timeout, **kwargs)
+            response = await client.send(request, stream=True)
+            try:
+                content = await self._read(response, max_size)
+            finally:
+                await response.aclose()
+        wire_size, body_size = convert_size(response.num_bytes_downloaded), convert_size(len(content))
+        logger.debug(f"[{url}] 传输 {wire_size}，解压后 {body_size}")
+        # 以读取的内容构造响应，内容已解压，去除压缩与长度相关的响应头
+        return httpx.Response(
+            response.status_code,
+            headers=[(key, value) for key, value in response.headers.multi_items() if key not in DECODED_HEADERS],
+            content=content,
+            request=response.request,
+            extensions=response.extensions,
+            history=response.history,
+        )
+
+    @staticmethod
+    async def _read(response: httpx.Response, max_size: int) -> bytes:
+        """
+        边接收边解压读取响应内容，超过大小限制时立即中止
+        """
+        if max_size > 0:
+            length = response.headers.get("Content-Length", "")
+            # Content-Length 为压缩后的大小，解压后只会更大
+            if length.isdigit() and int(length) > max_size:
+                raise ResponseTooLarge(f"Content-Length {length} 超过限制 {max_size}")
+        chunks: List[bytes] = []
+        size = 0
+        async for chunk in response.aiter_bytes():
+            size += len(chunk)
+            if 0 < max_size < size:
+                raise ResponseTooLarge(f"响应内容超过限制 {max_size}")
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+
+http_client = HTTPClient()
+"""
+插件的 HTTP 客户端
+"""
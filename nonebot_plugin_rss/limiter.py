@@ -0,0 +1,142 @@
+import time
+import asyncio
+from fnmatch import fnmatch
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, TypedDict, AsyncGenerator
+
+from yarl import URL
+
+from .config import HostLimit, plugin_config
+
+
+class LimiterStats(TypedDict):
+    """
+    主机限流统计
+    """
+
+    requests: int
+    """
+    累计请求数量
+    """
+    waited: int
+    """
+    需要等待的请求数量
+    """
+    wait_total: float
+    """
+    累计等待时间，单位秒
+    """
+    wait_max: float
+    """
+    最大等待时间，单位秒
+    """
+
+
+class TokenBucket:
+    """
+    令牌桶，按 `rate` 个/秒补充令牌，最多积累 `burst` 个
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate: float = rate
+        self.burst: int = max(burst, 1)
+        self._tokens: float = self.burst
+        self._updated: float = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def acquire(self) -> None:
+        """
+        取出一个令牌，没有令牌时按先来后到等待
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class HostState:
+    """
+    单个主机的限流状态
+    """
+
+    def __init__(self, limit: HostLimit):
+        self.bucket: Optional[TokenBucket] = TokenBucket(limit.rate, limit.burst) if limit.rate > 0 else None
+        self.semaphore: Optional[asyncio.Semaphore] = (
+            asyncio.Semaphore(limit.concurrency) if limit.concurrency > 0 else None
+        )
+        self.stats: LimiterStats = LimiterStats(requests=0, waited=0, wait_total=0, wait_max=0)
+
+
+class HostLimiter:
+    """
+    按主机限流
+
+    订阅抓取与图片下载共用，每个主机一个令牌桶限制请求速率，一个信号量限制同时进行的请求数量；
+    限制规则按 `rss_host_limits` 中的主机通配符依次匹配，未匹配的主机使用 `rss_host_default_limit`
+    """
+
+    def __init__(self, limits: Dict[str, HostLimit], default: HostLimit):
+        self.limits: Dict[str, HostLimit] = limits
+        """
+        主机通配符到限制规则的映射，如 `*.sinaimg.cn`
+        """
+        self.default: HostLimit = default
+        """
+        默认限制规则
+        """
+        self._hosts: Dict[str, HostState] = {}
+
+    def get_limit(self, host: str) -> HostLimit:
+        """
+        获取主机的限制规则
+        """
+        return next((limit for pattern, limit in self.limits.items() if fnmatch(host, pattern)), self.default)
+
+    def _get_state(self, host: str) -> HostState:
+        if (state := self._hosts.get(host)) is None:
+            state = self._hosts[host] = HostState(self.get_limit(host))
+        return state
+
+    @asynccontextmanager
+    async def limit(self, url: str) -> AsyncGenerator[None, None]:
+        """
+        在限制内执行请求，按需等待令牌与空闲的并发名额
+        """
+        host = (URL(url).host or "").lower()
+        state = self._get_state(host)
+        start_time = time.monotonic()
+        if state.semaphore is not None:
+            await state.semaphore.acquire()
+        try:
+            if state.bucket is not None:
+                await state.bucket.acquire()
+            wait = time.monotonic() - start_time
+            stats = state.stats
+            stats["requests"] += 1
+            if wait > 0.001:
+                stats["waited"] += 1
+                stats["wait_total"] += wait
+                stats["wait_max"] = max(stats["wait_max"], wait)
+            yield
+        finally:
+            if state.semaphore is not None:
+                state.semaphore.release()
+
+    def stats(self) -> Dict[str, LimiterStats]:
+        """
+        获取各主机的限流统计
+        """
+        return {host: LimiterStats(**state.stats) for host, state in self._hosts.items()}
+
+
+host_limiter = HostLimiter(plugin_config.rss_host_limits, plugin_config.rss_host_default_limit)
+"""
+主机限流器
+"""
@@ -0,0 +1,206 @@
+import time
+import asyncio
+from typing import Any, Set, Dict, List, Tuple, Callable, Optional, Awaitable, TypedDict
+
+import httpx
+from nonebot.log import logger
+
+from .config import plugin_config
+
+SMOOTHING = 0.2
+"""
+延迟与成功率的指数平滑系数
+"""
+MAX_FAILURES = 3
+"""
+连续失败多少次后暂停使用该地址
+"""
+
+
+class MirrorStats(TypedDict):
+    """
+    RSSHub 地址运行统计
+    """
+
+    latency: Optional[float]
+    """
+    平滑后的响应延迟，单位秒，尚无成功请求时为 None
+    """
+    success_rate: float
+    """
+    平滑后的成功率
+    """
+    requests: int
+    """
+    累计完成的请求数量
+    """
+    failures: int
+    """
+    连续失败次数
+    """
+    demoted_until: float
+    """
+    暂停使用的截止时间戳，为 0 时表示正常
+    """
+
+
+class MirrorManager:
+    """
+    RSSHub 地址管理器
+
+    记录主地址与各备用地址的延迟与成功率，先请求主地址，
+    超过 `hedge_delay` 秒仍未成功或请求失败时，按评分依次向备用地址发起对冲请求，
+    采用最先成功的响应并取消其余请求；连续失败的地址在 `cooldown` 秒内不再使用
+    """
+
+    def __init__(self, primary: str, backups: List[str], hedge_delay: float, cooldown: float):
+        self.primary: str = primary
+        """
+        RSSHub 主地址
+        """
+        self.backups: List[str] = [base for base in dict.fromkeys(backups) if base != primary]
+        """
+        RSSHub 备用地址
+        """
+        self.hedge_delay: float = hedge_delay
+        """
+        发起下一个对冲请求前的等待时间，单位秒
+        """
+        self.cooldown: float = cooldown
+        """
+        不健康地址的暂停使用时间，单位秒
+        """
+        self._stats: Dict[str, MirrorStats] = {
+            base: MirrorStats(latency=None, success_rate=1, requests=0, failures=0, demoted_until=0)
+            for base in [primary, *self.backups]
+        }
+
+    def is_healthy(self, base: str, now: Optional[float] = None) -> bool:
+        """
+        地址是否可用，不在暂停使用期内
+        """
+        return self._stats[base]["demoted_until"] <= (now or time.time())
+
+    def _score(self, base: str) -> float:
+        """
+        地址评分，越小越优先：延迟除以成功率，尚无延迟记录时按对冲等待时间估计
+        """
+        stats = self._stats[base]
+        latency = stats["latency"] if stats["latency"] is not None else self.hedge_delay
+        return latency / max(stats["success_rate"], 0.05)
+
+    def candidates(self) -> List[str]:
+        """
+        获取本次请求的地址顺序
+
+        主地址在前，备用地址按评分排序，跳过暂停使用的地址；全部暂停时按原顺序全部尝试
+        """
+        now = time.time()
+        backups = sorted((base for base in self.backups if self.is_healthy(base, now)), key=self._score)
+        bases = [self.primary, *backups] if self.is_healthy(self.primary, now) else backups
+        return bases or [self.primary, *self.backups]
+
+    def record(self, base: str, success: bool, latency: float) -> None:
+        """
+        记录一次请求结果
+        """
+        stats = self._stats[base]
+        stats["requests"] += 1
+        stats["success_rate"] += SMOOTHING * (success - stats["success_rate"])
+        if success:
+            stats["failures"] = 0
+            stats["demoted_until"] = 0
+            stats["latency"] = (
+                latency if stats["latency"] is None else stats["latency"] + SMOOTHING * (latency - stats["latency"])
+            )
+            return
+        stats["failures"] += 1
+        if stats["failures"] >= MAX_FAILURES:
+            stats["failures"] = 0
+            stats["demoted_until"] = time.time() + self.cooldown
+            logger.warning(f"RSSHub 地址 {base} 连续请求失败，{self.cooldown:.0f}s 内暂停使用")
+
+    async def _attempt(self, base: str, send: Callable[[str], Awaitable[httpx.Response]]) -> httpx.Response:
+        """
+        向指定地址发起请求并记录结果，被取消的请求不计入统计
+        """
+        start_time = time.monotonic()
+        try:
+            response = await send(base)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.record(base, False, time.monotonic() - start_time)
+            raise
+        self.record(base, response.status_code < 400, time.monotonic() - start_time)
+        return response
+
+    async def request(self, send: Callable[[str], Awaitable[httpx.Response]]) -> Tuple[str, httpx.Response]:
+        """
+        按地址顺序发起对冲请求
+
+        参数:
+            send: 向指定 RSSHub 地址发起请求的函数
+
+        返回最先成功（状态码小于 400）的地址与响应；全部失败时返回最后一个失败的地址与响应，
+        没有任何响应时抛出最后一个异常
+        """
+        bases = self.candidates()
+        pending: Set["asyncio.Task[httpx.Response]"] = set()
+        task_bases: Dict["asyncio.Task[httpx.Response]", str] = {}
+        last_response: Optional[Tuple[str, httpx.Response]] = None
+        last_error: Optional[BaseException] = None
+
+        def launch() -> None:
+            base = bases[len(task_bases)]
+            task = asyncio.create_task(self._attempt(base, send))
+            task_bases[task] = base
+            pending.add(task)
+
+        launch()
+        try:
+            while pending:
+                hedge = len(task_bases) < len(bases)
+                done, _ = await asyncio.wait(
+                    pending, timeout=self.hedge_delay if hedge else None, return_when=asyncio.FIRST_COMPLETED
+                )
+                pending.difference_update(done)
+                failed = not done
+                for task in done:
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                        failed = True
+                        continue
+                    base, response = task_bases[task], task.result()
+                    if response.status_code < 400:
+                        if base != self.primary:
+                            logger.debug(f"使用 RSSHub 地址 {base} 请求成功")
+                        return base, response
+                    last_response = base, response
+                    failed = True
+                if failed and hedge:
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+        if last_response is not None:
+            return last_response
+        assert last_error is not None
+        raise last_error
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取各地址的运行统计
+        """
+        return {base: dict(stats) for base, stats in self._stats.items()}
+
+
+mirror_manager = MirrorManager(
+    str(plugin_config.rss_rsshub),
+    [str(base) for base in plugin_config.rsshub_backup],
+    hedge_delay=plugin_config.rss_hedge_delay,
+    cooldown=plugin_config.rss_mirror_cooldown * 60,
+)
+"""
+RSSHub 地址管理器
+"""
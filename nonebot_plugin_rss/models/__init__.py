@@ -4,3 +4,5 @@ from .feed import FeedEntry as FeedEntry
 from .feed import FeedParser as FeedParser
 from .cache import EntryCache as EntryCache
 from .feed import FeedChannel as FeedChannel
+from .session import checkpoint as checkpoint
+from .session import check_session as check_session
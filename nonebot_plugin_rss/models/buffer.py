@@ -0,0 +1,121 @@
+from typing import TYPE_CHECKING, Any, Dict
+
+from nonebot.log import logger
+from sqlalchemy import select, update
+from nonebot_plugin_apscheduler import scheduler
+from apscheduler.triggers.interval import IntervalTrigger
+
+from .session import use_session
+from ..config import plugin_config
+
+if TYPE_CHECKING:
+    from .rss import Rss
+
+
+class MetaBuffer:
+    """
+    订阅元数据延迟写入缓冲区
+
+    合并同一订阅多次修改的字段，由定时任务与关闭时批量写入数据库
+    """
+
+    def __init__(self):
+        self._pending: Dict[int, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def mark(self, rss_id: int, values: Dict[str, Any]) -> None:
+        """
+        记录修改的字段
+        """
+        self._pending.setdefault(rss_id, {}).update(values)
+
+    def apply(self, rss: "Rss") -> None:
+        """
+        将尚未写入的字段应用到订阅实例，并移出缓冲区
+
+        用于整体更新订阅前，避免从数据库读取的旧值覆盖缓冲区中的新值
+        """
+        for key, value in self._pending.pop(rss.id, {}).items():
+            setattr(rss, key, value)
+
+    def overlay(self, rss: "Rss") -> "Rss":
+        """
+        将尚未写入的字段应用到从数据库读取的订阅实例，字段仍保留在缓冲区中等待写入
+
+        用于读取订阅后，避免在写入前读取到旧的元数据
+        """
+        for key, value in self._pending.get(rss.id, {}).items():
+            setattr(rss, key, value)
+        return rss
+
+    def discard(self, rss_id: int) -> None:
+        """
+        丢弃指定订阅尚未写入的字段
+        """
+        self._pending.pop(rss_id, None)
+
+    async def flush(self) -> int:
+        """
+        批量写入缓冲区中的修改，返回写入的订阅数量
+
+        已删除的订阅直接丢弃；批量写入失败时改为逐个写入，只有写入失败的订阅放回缓冲区
+        """
+        from .rss import Rss
+
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        try:
+            async with use_session() as session:
+                existing = set((await session.execute(select(Rss.id).where(Rss.id.in_(pending)))).scalars())
+                rows = [{"id": rss_id, **values} for rss_id, values in pending.items() if rss_id in existing]
+                if rows:
+                    await session.execute(update(Rss), rows)
+        except Exception as e:
+            logger.warning(f"订阅元数据批量写入失败，改为逐个写入！{repr(e)}")
+            return await self._flush_each(pending)
+        if dropped := len(pending) - len(rows):
+            logger.debug(f"丢弃 {dropped} 个已删除订阅的元数据")
+        logger.trace(f"已写入 {len(rows)} 个订阅的元数据")
+        return len(rows)
+
+    async def _flush_each(self, pending: Dict[int, Dict[str, Any]]) -> int:
+        """
+        逐个写入修改，订阅已删除时不影响其他订阅，写入失败的订阅放回缓冲区
+        """
+        from .rss import Rss
+
+        written = 0
+        for rss_id, values in pending.items():
+            try:
+                async with use_session() as session:
+                    result = await session.execute(update(Rss).where(Rss.id == rss_id).values(**values))
+                written += bool(result.rowcount)  # type: ignore
+            except Exception as e:
+                logger.error(f"订阅 {rss_id} 的元数据写入失败！{repr(e)}")
+                # 放回缓冲区，不覆盖期间产生的新修改
+                self._pending[rss_id] = {**values, **self._pending.get(rss_id, {})}
+        return written
+
+
+meta_buffer = MetaBuffer()
+"""
+全局订阅元数据延迟写入缓冲区
+"""
+
+
+def add_flush_job() -> None:
+    """
+    添加元数据定时写入任务
+    """
+    scheduler.add_job(
+        func=meta_buffer.flush,  # 定时任务
+        trigger=IntervalTrigger(seconds=plugin_config.rss_meta_flush_interval),  # 触发器
+        id="RSS_FLUSH_META",  # 任务 ID
+        max_instances=1,  # 最大并发
+        coalesce=True,  # 合并所有错过的 Job
+        replace_existing=True,  # 替换同名任务
+    )
+    logger.debug("定时任务 RSS_FLUSH_META 添加成功")
@@ -1,11 +1,12 @@
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime, timedelta
 
 from sqlalchemy.orm import Mapped, mapped_column
 from nonebot_plugin_orm import Model, get_session
-from sqlalchemy import String, Integer, DateTime, or_, and_, delete, select
+from sqlalchemy import Index, String, Integer, DateTime, or_, and_, delete, insert, select
 
 from .feed import FeedEntry
+from .session import use_session
 from ..config import plugin_config
 
 
@@ -14,7 +15,12 @@ class EntryCache(Model):
     订阅内容去重缓存
     """
 
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        Index("ix_nonebot_plugin_rss_entrycache_rss_id_link", "rss_id", "link"),
+        Index("ix_nonebot_plugin_rss_entrycache_rss_id_title", "rss_id", "title"),
+        Index("ix_nonebot_plugin_rss_entrycache_rss_id_image_hash", "rss_id", "image_hash"),
+        {"extend_existing": True},
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     """
@@ -36,22 +42,30 @@ class EntryCache(Model):
     """
     图片指纹
     """
-    time: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    time: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
     """
     发布时间
     """
 
     @staticmethod
-    async def delete_expired() -> None:
+    async def delete_expired(batch_size: int) -> int:
         """
         删除过期缓存
+
+        每次最多删除 `batch_size` 条并提交，返回删除的数量
         """
+        deleted = 0
+        expire_time = datetime.utcnow() - timedelta(days=plugin_config.rss_cache_expire)
         async with get_session() as session:
-            stmt = delete(EntryCache).where(
-                EntryCache.time < datetime.utcnow() - timedelta(days=plugin_config.rss_cache_expire)
-            )
-            await session.execute(stmt)
-            await session.commit()
+            while True:
+                stmt = select(EntryCache.id).where(EntryCache.time < expire_time).limit(batch_size)
+                ids = (await session.execute(stmt)).scalars().all()
+                if not ids:
+                    break
+                await session.execute(delete(EntryCache).where(EntryCache.id.in_(ids)))
+                await session.commit()
+                deleted += len(ids)
+        return deleted
 
     @staticmethod
     async def check_exist(
@@ -64,7 +78,7 @@ class EntryCache(Model):
         """
         检查缓存是否存在
         """
-        async with get_session() as session:
+        async with use_session() as session:
             stmt = select(EntryCache).where(EntryCache.rss_id == rss_id)
             clauses = []
             clauses.append(EntryCache.link == link) if link else None
@@ -84,7 +98,7 @@ class EntryCache(Model):
         """
         添加缓存
         """
-        async with get_session() as session:
+        async with use_session() as session:
             session.add(
                 EntryCache(
                     rss_id=rss_id,
@@ -93,5 +107,28 @@ class EntryCache(Model):
                     image_hash=entry.image_hash,
                 )
             )
-            await session.commit()
             return True
+
+    @staticmethod
+    async def add_all(rss_id: int, entries: List[FeedEntry]) -> int:
+        """
+        批量添加缓存
+
+        在同一个事务中使用 executemany 方式写入，返回写入的数量
+        """
+        if not entries:
+            return 0
+        now = datetime.utcnow()
+        values = [
+            {
+                "rss_id": rss_id,
+                "link": entry.link or "",
+                "title": entry.title or "",
+                "image_hash": entry.image_hash or "",
+                "time": now,
+            }
+            for entry in entries
+        ]
+        async with use_session() as session:
+            await session.execute(insert(EntryCache), values)
+        return len(values)
@@ -1,10 +1,19 @@
 from hashlib import md5
+from typing import Set, List
 
 from sqlalchemy.orm import Mapped, mapped_column
 from nonebot_plugin_orm import Model, get_session
-from sqlalchemy import String, Integer, delete, select
+from sqlalchemy import Index, String, Integer, func, delete, insert, select
 
 from .feed import FeedEntry
+from .seen import seen_index
+from ..utils import partition_list
+from .session import on_commit, use_session
+
+CHUNK_SIZE = 500
+"""
+批量查询时每条语句包含的最大参数数量，避免超出 SQLite 的变量数量限制
+"""
 
 
 class Entry(Model):
@@ -12,7 +21,10 @@ class Entry(Model):
     订阅内容
     """
 
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        Index("ix_nonebot_plugin_rss_entry_rss_id_hash", "rss_id", "hash"),
+        {"extend_existing": True},
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     """
@@ -40,23 +52,38 @@ class Entry(Model):
     """
 
     @staticmethod
-    async def check_exist(rss_id: int, entry: FeedEntry) -> bool:
+    def get_hash(entry: FeedEntry) -> str:
         """
-        检查内容是否存在
+        计算内容指纹
         """
-        hash = md5(f"{entry.title}{entry.link}{entry.published}".encode()).hexdigest()
-        async with get_session() as session:
-            stmt = select(Entry).where(Entry.rss_id == rss_id, Entry.hash == hash)
-            result = await session.execute(stmt)
-            return bool(result.first() is not None)
+        return md5(f"{entry.title}{entry.link}{entry.published}".encode()).hexdigest()
+
+    @staticmethod
+    async def get_new_hashes(rss_id: int, entries: List[FeedEntry]) -> Set[str]:
+        """
+        批量检查内容是否存在
+
+        先查询内存索引，再使用 `IN` 查询一次性获取其余已存在的指纹，返回不存在的指纹集合
+        """
+        hashes = seen_index.filter_unseen(rss_id, {Entry.get_hash(entry) for entry in entries})
+        if not hashes:
+            return set()
+        exists: Set[str] = set()
+        async with use_session() as session:
+            for chunk in partition_list(list(hashes), CHUNK_SIZE):
+                stmt = select(Entry.hash).where(Entry.rss_id == rss_id, Entry.hash.in_(chunk))
+                exists.update((await session.execute(stmt)).scalars().all())
+            # 预热内存索引，查询结果可能包含未提交的内容，因此在提交后写入
+            on_commit(session, lambda: seen_index.add(rss_id, exists))
+        return hashes - exists
 
     @staticmethod
     async def add(rss_id: int, entry: FeedEntry) -> bool:
         """
         添加内容
         """
-        hash = md5(f"{entry.title}{entry.link}{entry.published}".encode()).hexdigest()
-        async with get_session() as session:
+        hash = Entry.get_hash(entry)
+        async with use_session() as session:
             session.add(
                 Entry(
                     rss_id=rss_id,
@@ -66,15 +93,71 @@ class Entry(Model):
                     hash=hash,
                 )
             )
-            await session.commit()
-            return True
+            on_commit(session, lambda: seen_index.add(rss_id, [hash]))
+        return True
+
+    @staticmethod
+    async def add_all(rss_id: int, entries: List[FeedEntry]) -> int:
+        """
+        批量添加内容
+
+        在同一个事务中使用 executemany 方式写入，返回写入的数量
+        """
+        if not entries:
+            return 0
+        values = [
+            {
+                "rss_id": rss_id,
+                "title": entry.title or "",
+                "link": entry.link or "",
+                "published": entry.published or "",
+                "hash": Entry.get_hash(entry),
+            }
+            for entry in entries
+        ]
+        async with use_session() as session:
+            await session.execute(insert(Entry), values)
+            on_commit(session, lambda: seen_index.add(rss_id, [value["hash"] for value in values]))
+        return len(values)
 
     @staticmethod
     async def clear(rss_id: int) -> None:
         """
         清空内容
         """
-        async with get_session() as session:
+        async with use_session() as session:
             stmt = delete(Entry).where(Entry.rss_id == rss_id)
             await session.execute(stmt)
-            await session.commit()
+            on_commit(session, lambda: seen_index.discard(rss_id))
+
+    @staticmethod
+    async def get_overflowed(limit: int) -> List[int]:
+        """
+        获取内容数量超出限制的订阅 ID 列表
+        """
+        async with get_session() as session:
+            stmt = select(Entry.rss_id).group_by(Entry.rss_id).having(func.count(Entry.id) > limit)
+            return list((await session.execute(stmt)).scalars().all())
+
+    @staticmethod
+    async def prune(rss_id: int, limit: int, batch_size: int) -> int:
+        """
+        清理超出数量限制的内容
+
+        按 ID 保留最新的 `limit` 条，每次最多删除 `batch_size` 条并提交，返回删除的数量
+        """
+        deleted = 0
+        async with get_session() as session:
+            stmt = select(Entry.id).where(Entry.rss_id == rss_id).order_by(Entry.id.desc()).offset(limit).limit(1)
+            cutoff = (await session.execute(stmt)).scalar()
+            if cutoff is None:
+                return 0
+            while True:
+                stmt = select(Entry.id).where(Entry.rss_id == rss_id, Entry.id <= cutoff).limit(batch_size)
+                ids = (await session.execute(stmt)).scalars().all()
+                if not ids:
+                    break
+                await session.execute(delete(Entry).where(Entry.id.in_(ids)))
+                await session.commit()
+                deleted += len(ids)
+        return deleted
@@ -1,6 +1,6 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
-from pydantic import Field, BaseModel, AnyHttpUrl
+from pydantic import Field, BaseModel, AnyHttpUrl, root_validator
 
 
 class FeedChannel(BaseModel):
@@ -17,6 +17,25 @@ class FeedChannel(BaseModel):
     generator: Optional[str] = None
     published: Optional[str] = None
     ttl: Optional[int] = None
+    hub: Optional[str] = None
+    """
+    WebSub hub 地址，来自 rel="hub" 的链接
+    """
+    self_link: Optional[str] = None
+    """
+    订阅源自身地址，来自 rel="self" 的链接，作为 WebSub 的 topic
+    """
+
+    @root_validator(pre=True)
+    def _extract_links(cls, values: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        从 feedparser 解析出的链接列表中提取 hub 与 self 链接
+        """
+        links = values.get("links") or []
+        for rel, key in (("hub", "hub"), ("self", "self_link")):
+            if key not in values:
+                values[key] = next((link.get("href") for link in links if link.get("rel") == rel), None)
+        return values
 
 
 class FeedEntry(BaseModel):
@@ -1,12 +1,15 @@
-from typing import Any, List, Optional
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 
 from yarl import URL
+from nonebot_plugin_orm import Model
 from nonebot_plugin_saa import PlatformTarget
 from sqlalchemy.orm import Mapped, mapped_column
-from nonebot_plugin_orm import Model, get_session
-from sqlalchemy import JSON, String, Boolean, Integer, select
+from sqlalchemy import JSON, Float, String, Boolean, Integer, DateTime, false, select
 
 from .entry import Entry
+from .buffer import meta_buffer
+from .session import use_session
 from ..config import plugin_config
 
 
@@ -99,6 +102,14 @@ class Rss(Model):
     """
     上次更新时间
     """
+    validators: Mapped[Dict[str, List[Optional[str]]]] = mapped_column(JSON, default=dict, server_default="{}")
+    """
+    各 RSSHub 地址对应的 ETag 与 Last-Modified，配置了备用 RSSHub 时使用
+    """
+    digest: Mapped[Optional[str]] = mapped_column(String(32), default=None)
+    """
+    上次处理的响应内容摘要
+    """
     error_count: Mapped[int] = mapped_column(Integer, default=0)
     """
     连续抓取失败的次数，超过 100 就停止更新
@@ -107,6 +118,42 @@ class Rss(Model):
     """
     是否停止更新
     """
+    last_check: Mapped[Optional[datetime]] = mapped_column(DateTime, default=None)
+    """
+    上次检查时间，UTC
+    """
+    next_check: Mapped[Optional[datetime]] = mapped_column(DateTime, default=None)
+    """
+    下次检查时间，UTC
+    """
+    adaptive: Mapped[bool] = mapped_column(Boolean, default=False, server_default=false())
+    """
+    是否根据更新频率自动调整检查间隔
+    """
+    update_rate: Mapped[Optional[float]] = mapped_column(Float, default=None)
+    """
+    估计的更新频率，单位 条/小时
+    """
+    learned_interval: Mapped[Optional[int]] = mapped_column(Integer, default=None)
+    """
+    自动调整后的检查间隔，单位秒
+    """
+    hub: Mapped[Optional[str]] = mapped_column(String(512), default=None)
+    """
+    WebSub hub 地址，未使用推送时为 None
+    """
+    hub_topic: Mapped[Optional[str]] = mapped_column(String(512), default=None)
+    """
+    WebSub 订阅的 topic
+    """
+    hub_secret: Mapped[Optional[str]] = mapped_column(String(64), default=None)
+    """
+    WebSub 推送内容签名的密钥
+    """
+    hub_expires: Mapped[Optional[datetime]] = mapped_column(DateTime, default=None)
+    """
+    WebSub 订阅的到期时间，UTC，hub 确认订阅前为 None
+    """
 
     def __init__(self, **kwargs: Any) -> None:
         self.time = "5"
@@ -125,8 +172,19 @@ class Rss(Model):
         self.contents_to_remove = []
         self.etag = None
         self.last_modified = None
+        self.validators = {}
+        self.digest = None
         self.error_count = 0
         self.stop = False
+        self.last_check = None
+        self.next_check = None
+        self.adaptive = False
+        self.update_rate = None
+        self.learned_interval = None
+        self.hub = None
+        self.hub_topic = None
+        self.hub_secret = None
+        self.hub_expires = None
         super().__init__(**kwargs)
 
     def get_url(self, rsshub: str = plugin_config.rss_rsshub) -> str:
@@ -184,14 +242,28 @@ class Rss(Model):
         self.cookie = cookies
         await self.update()
 
+    def set_meta(self, **values: Any) -> None:
+        """
+        更新抓取元数据：etag、last_modified、error_count 等
+
+        只记录发生变化的字段，由延迟写入缓冲区批量写入数据库
+        """
+        changed = {key: value for key, value in values.items() if getattr(self, key) != value}
+        if not changed:
+            return
+        for key, value in changed.items():
+            setattr(self, key, value)
+        if self.id:
+            meta_buffer.mark(self.id, changed)
+
     async def delete(self) -> None:
         """
         删除订阅
         """
+        meta_buffer.discard(self.id)
         await Entry.clear(self.id)
-        async with get_session() as session:
+        async with use_session() as session:
             await session.delete(self)
-            await session.commit()
 
     async def update(self) -> "Rss":
         """
@@ -200,9 +272,10 @@ class Rss(Model):
         if (not self.id) and (rss := await Rss.get_rss(self.name, self.bot_id)):
             # 更新数据
             self.id = rss.id
-        async with get_session() as session:
+        if self.id:
+            meta_buffer.apply(self)
+        async with use_session() as session:
             await session.merge(self)
-            await session.commit()
             await session.flush()
         return self
 
@@ -231,6 +304,14 @@ class Rss(Model):
             f"订阅名称：{self.name}",
             f"订阅链接：{self.url}",
             f"更新时间：{self.time}",
+            _option_str("自动调整", self.adaptive),
+            _option_str("当前间隔", f"{self.learned_interval / 60:.1f} 分钟")
+            if self.adaptive and self.learned_interval
+            else None,
+            _option_str("更新频率", f"{self.update_rate:.2f} 条/小时") if self.update_rate is not None else None,
+            _option_str("推送订阅", f"{self.hub}，{self.hub_expires:%Y-%m-%d %H:%M} UTC 到期")
+            if self.hub and self.hub_expires
+            else None,
             _option_str("订阅目标", self.targets) if privacy else None,
             _option_str("使用代理", self.proxy),
             _option_str("使用翻译", self.translate),
@@ -254,21 +335,31 @@ class Rss(Model):
         """
         根据机器人 ID 获取订阅列表
         """
-        async with get_session() as session:
+        async with use_session() as session:
             stmt = select(Rss)
             if bot_id is not None:
                 stmt = stmt.where(Rss.bot_id == bot_id)
             rss_list = (await session.execute(stmt)).scalars().all()
-        return list(rss_list)
+        # 应用尚未写入数据库的元数据
+        return [meta_buffer.overlay(rss) for rss in rss_list]
+
+    @staticmethod
+    async def get_rss_by_id(rss_id: int) -> Optional["Rss"]:
+        """
+        根据订阅 ID 获取订阅
+        """
+        async with use_session() as session:
+            rss = await session.get(Rss, rss_id)
+        return meta_buffer.overlay(rss) if rss is not None else None
 
     @staticmethod
     async def get_rss(name: str, bot_id: Optional[str] = None) -> Optional["Rss"]:
         """
         根据订阅名获取订阅
         """
-        async with get_session() as session:
+        async with use_session() as session:
             stmt = select(Rss).where(Rss.name == name)
             if bot_id is not None:
                 stmt = stmt.where(Rss.bot_id == bot_id)
             rss: Optional["Rss"] = (await session.execute(stmt)).scalars().first()
-        return rss
+        return meta_buffer.overlay(rss) if rss is not None else None
@@ -0,0 +1,80 @@
+from typing import Set, Iterable
+from collections import OrderedDict
+
+from ..config import plugin_config
+
+
+class SeenIndex:
+    """
+    已读内容指纹的内存索引
+
+    按订阅保存已确认写入数据库的指纹，只用于判断内容一定已读，不在索引中的指纹仍需查询数据库
+
+    指纹以 64 位整数保存，总数超出容量时淘汰最久未检查的订阅，被淘汰的订阅在下次检查时重新预热
+    """
+
+    def __init__(self, capacity: int, feed_capacity: int):
+        self.capacity: int = capacity
+        """
+        所有订阅的指纹总数上限
+        """
+        self.feed_capacity: int = feed_capacity
+        """
+        单个订阅的指纹数量上限，超出时丢弃该订阅的索引
+        """
+        self._feeds: "OrderedDict[int, Set[int]]" = OrderedDict()
+        self._size: int = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @staticmethod
+    def _key(hash: str) -> int:
+        """
+        截取指纹前 64 位作为索引键
+        """
+        return int(hash[:16], 16)
+
+    def filter_unseen(self, rss_id: int, hashes: Iterable[str]) -> Set[str]:
+        """
+        过滤掉一定已读的指纹，返回需要查询数据库的指纹
+        """
+        feed = self._feeds.get(rss_id)
+        if feed is None:
+            return set(hashes)
+        self._feeds.move_to_end(rss_id)
+        return {hash for hash in hashes if self._key(hash) not in feed}
+
+    def add(self, rss_id: int, hashes: Iterable[str]) -> None:
+        """
+        记录已写入数据库的指纹
+        """
+        feed = self._feeds.get(rss_id)
+        if feed is None:
+            feed = self._feeds[rss_id] = set()
+        else:
+            self._feeds.move_to_end(rss_id)
+        size = len(feed)
+        feed.update(self._key(hash) for hash in hashes)
+        self._size += len(feed) - size
+        if len(feed) > self.feed_capacity:
+            self.discard(rss_id)
+        while self._size > self.capacity and self._feeds:
+            _, evicted = self._feeds.popitem(last=False)
+            self._size -= len(evicted)
+
+    def discard(self, rss_id: int) -> None:
+        """
+        丢弃指定订阅的索引
+        """
+        if (feed := self._feeds.pop(rss_id, None)) is not None:
+            self._size -= len(feed)
+
+
+seen_index = SeenIndex(
+    capacity=plugin_config.rss_seen_cache_size,
+    feed_capacity=plugin_config.rss_num_limit * 2 if plugin_config.rss_num_limit > 0 else 1000,
+)
+"""
+全局已读内容索引
+"""
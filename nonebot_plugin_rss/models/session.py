@@ -0,0 +1,70 @@
+from contextvars import ContextVar
+from contextlib import asynccontextmanager
+from typing import Any, List, Callable, Optional, AsyncGenerator
+
+from nonebot_plugin_orm import get_session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+_check_session: ContextVar[Optional[AsyncSession]] = ContextVar("rss_check_session", default=None)
+"""
+当前检查更新周期共享的会话
+"""
+
+
+async def _commit(session: AsyncSession) -> None:
+    """
+    提交会话并执行提交后回调
+    """
+    await session.commit()
+    callbacks: List[Callable[[], Any]] = session.info.pop("rss_on_commit", [])
+    for callback in callbacks:
+        callback()
+
+
+def on_commit(session: AsyncSession, callback: Callable[[], Any]) -> None:
+    """
+    注册会话提交后执行的回调，会话回滚时不执行
+    """
+    session.info.setdefault("rss_on_commit", []).append(callback)
+
+
+@asynccontextmanager
+async def check_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    检查更新周期内共享的会话
+
+    周期内的模型操作共用此会话，在检查点与周期结束时统一提交，出现异常时回滚；嵌套使用时复用外层会话
+    """
+    if (session := _check_session.get()) is not None:
+        yield session
+        return
+    async with get_session(expire_on_commit=False) as session:
+        token = _check_session.set(session)
+        try:
+            yield session
+            await _commit(session)
+        finally:
+            _check_session.reset(token)
+
+
+async def checkpoint() -> None:
+    """
+    提交检查更新周期内已有的修改并释放连接
+    """
+    if (session := _check_session.get()) is not None:
+        await _commit(session)
+
+
+@asynccontextmanager
+async def use_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    获取模型操作使用的会话
+
+    处于检查更新周期内时使用共享会话，由周期统一提交；否则使用独立会话并在结束时提交
+    """
+    if (session := _check_session.get()) is not None:
+        yield session
+        return
+    async with get_session(expire_on_commit=False) as session:
+        yield session
+        await _commit(session)
@@ -1,6 +1,6 @@
 import re
 from io import BytesIO
-from typing import List
+from typing import List, Optional
 from difflib import SequenceMatcher
 
 import arrow
@@ -14,10 +14,10 @@ from .html import handle_html
 from .media import handle_media
 from ..config import plugin_config
 from .translate import handle_translate
-from .parse import ParseBase, ParseState
+from .parse import ParseBase, ParseState, get_doc
 from .parse import ParseRss as ParseRss
-from ..models import Rss, Entry, FeedEntry, EntryCache
-from .utils import get_time, check_new, get_summary, check_filter
+from ..models import Rss, Entry, FeedEntry, EntryCache, checkpoint
+from .utils import get_time, check_new, has_image, get_summary, check_filter
 
 
 @ParseBase.append_before_handler()
@@ -38,34 +38,37 @@ async def _(rss: Rss, state: ParseState) -> ParseState:
     logger.trace(f"{rss.name} 开始判断是否满足推送条件")
     new_data = state["new_data"]
     assert new_data is not None
+    skipped: List[FeedEntry] = []
     for item in new_data.copy():
         summary = get_summary(item)
         # 检查是否包含屏蔽词
         if plugin_config.rss_black_word and re.findall("|".join(plugin_config.rss_black_word), summary):
             logger.info(f"{rss.name} 检测到屏蔽词，跳过消息推送")
-            await Entry.add(rss.id, item)
+            skipped.append(item)
             new_data.remove(item)
             continue
         # 检查是否匹配白名单关键字
         if rss.white_keyword and not (
             re.search(rss.white_keyword, item.title or "") or re.search(rss.white_keyword, summary)
         ):
-            await Entry.add(rss.id, item)
+            skipped.append(item)
             new_data.remove(item)
             continue
         # 检查是否匹配黑名单关键字
         if rss.black_keyword and (
             re.search(rss.black_keyword, item.title or "") or re.search(rss.black_keyword, summary)
         ):
-            await Entry.add(rss.id, item)
+            skipped.append(item)
             new_data.remove(item)
             continue
         # 检查是否只推送有图片的消息
-        if (rss.only_pic or rss.contains_pic) and not re.search(r"<img[^>]+>|\[img]", summary):
+        if (rss.only_pic or rss.contains_pic) and not has_image(get_doc(state, item), summary):
             logger.info(f"{rss.name} 已开启仅图片/仅含有图片，已跳过无图片消息推送")
-            await Entry.add(rss.id, item)
+            skipped.append(item)
             new_data.remove(item)
             continue
+    # 跳过的消息一次性写入
+    await Entry.add_all(rss.id, skipped)
     state["new_data"] = new_data
     return state
 
@@ -79,23 +82,25 @@ async def _(rss: Rss, state: ParseState) -> ParseState:
     if not rss.filters:
         # 未启用去重
         return state
+    # 图片去重需要下载图片，先提交已跳过条目的写入，避免下载期间占用数据库写锁
+    await checkpoint()
     new_data = state["new_data"]
-    await EntryCache.delete_expired()
     delete: List[int] = []
     for index, item in enumerate(new_data):
-        is_duplicate, image_hash = await check_filter(rss, item)
+        is_duplicate, image_hash = await check_filter(rss, item, get_doc(state, item))
         if is_duplicate:
-            await Entry.add(rss.id, item)
             delete.append(index)
         else:
             new_data[index].image_hash = image_hash
+    # 重复的消息一次性写入
+    await Entry.add_all(rss.id, [item for index, item in enumerate(new_data) if index in delete])
     new_data = [item for index, item in enumerate(new_data) if index not in delete]
     state["new_data"] = new_data
     return state
 
 
 @ParseBase.append_handler(parsing_type="title")
-async def _(rss: Rss, state: ParseState, entry: FeedEntry) -> ParseState:
+async def _(rss: Rss, state: ParseState, entry: FeedEntry, doc: Optional[Pq]) -> ParseState:
     """
     处理标题
     """
@@ -121,14 +126,13 @@ async def _(rss: Rss, state: ParseState, entry: FeedEntry) -> ParseState:
         logger.debug(f"{rss.name} 只推送标题，跳过标题与正文相似度处理")
         return state
     # 判断标题与正文相似度，避免标题正文一样，或者是标题为正文前缀
-    try:
-        summary_html = Pq(get_summary(entry))
-        similarity = SequenceMatcher(None, summary_html.text()[: len(title)], title)
+    if doc is not None:
+        similarity = SequenceMatcher(None, doc.text()[: len(title)], title)
         # 标题正文相似度
         if similarity.ratio() > 0.6:
             result = ""
-    except Exception as e:
-        logger.warning(f"{rss.name} 没有正文内容！{e}")
+    else:
+        logger.warning(f"{rss.name} 没有正文内容！")
     text = emoji.emojize(result, language="alias")
     if rss.bot_id in plugin_config.rss_hide_url_bots:
         text = text.replace(".", "．")
@@ -149,17 +153,20 @@ async def _(rss: Rss, state: ParseState) -> ParseState:
 
 
 @ParseBase.append_handler(parsing_type="summary")
-async def _(rss: Rss, state: ParseState, entry: FeedEntry) -> ParseState:
+async def _(rss: Rss, state: ParseState, doc: Optional[Pq]) -> ParseState:
     """
     正文处理：HTML
     """
     logger.trace(f"{rss.name} 开始处理正文，HTML")
+    if doc is None:
+        logger.warning(f"{rss.name} 没有正文内容！")
+        return state
     try:
         # 处理正文并填入 text 字段
-        text = handle_html(html=Pq(get_summary(entry)))
+        text = handle_html(html=doc)
         state["text"] = text
     except Exception as e:
-        logger.warning(f"{rss.name} 没有正文内容！{e}")
+        logger.warning(f"{rss.name} 处理正文时出现错误：{e}")
     return state
 
 
@@ -211,7 +218,7 @@ async def _(rss: Rss, state: ParseState) -> ParseState:
 
 
 @ParseBase.append_handler(parsing_type="picture")
-async def _(rss: Rss, state: ParseState, entry: FeedEntry) -> ParseState:
+async def _(rss: Rss, state: ParseState, doc: Optional[Pq]) -> ParseState:
     """
     图片处理
     """
@@ -222,7 +229,7 @@ async def _(rss: Rss, state: ParseState, entry: FeedEntry) -> ParseState:
     text = ""
     images: List[BytesIO] = []
     try:
-        text, images = await handle_media(entry=entry, rss=rss)
+        text, images = await handle_media(doc=doc, rss=rss)
     except Exception as e:
         logger.warning(f"{rss.name} 处理图片时出现错误：{e}")
     message = state["message"]
@@ -273,12 +280,10 @@ async def _(rss: Rss, state: ParseState) -> ParseState:
     error_count = 0
     if await send_rss(rss, state["messages"], state["title"]):
         if rss.filters:
-            for d in state["new_data"]:
-                await EntryCache.add(rss.id, d)
+            await EntryCache.add_all(rss.id, state["new_data"])
     else:
         error_count += len(state["messages"])
-    for d in state["new_data"]:
-        await Entry.add(rss.id, d)
+    await Entry.add_all(rss.id, state["new_data"])
     message_count = len(state["new_data"])
     success_count = message_count - error_count
     if message_count > 10 and len(state["messages"]) == 10:
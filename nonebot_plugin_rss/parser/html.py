@@ -84,9 +84,11 @@ def handle_links(html: Pq, rss_str: str) -> str:
             ) or (str(a.attr("href")).startswith("https://weibo.com/") and str(a.text()).startswith("@")):
                 rss_str = rss_str.replace(a_str, str(a.text()))
             else:
-                if str(a.attr("href")).startswith("https://weibo.cn/sinaurl?u="):
-                    a.attr("href", URL(str(a.attr("href"))).query["u"])
-                rss_str = rss_str.replace(a_str, f" {a.text()}: {a.attr('href')}\n")
+                href = str(a.attr("href"))
+                # 文档在处理器间共享，只读取不修改
+                if href.startswith("https://weibo.cn/sinaurl?u="):
+                    href = URL(href).query["u"]
+                rss_str = rss_str.replace(a_str, f" {a.text()}: {href}\n")
         else:
             rss_str = rss_str.replace(a_str, f" {a.attr('href')}\n")
     return rss_str
@@ -5,16 +5,14 @@ from pathlib import Path
 from typing import List, Tuple, Union, Optional
 
 from yarl import URL
-from nonebot import get_driver
 from nonebot.log import logger
 from pyquery import PyQuery as Pq
 from PIL import Image, UnidentifiedImageError
-from nonebot.drivers import Driver, Request, HTTPClientMixin
 from tenacity import RetryError, retry, stop_after_delay, stop_after_attempt
 
-from . import utils
+from ..models import Rss
+from ..http import http_client
 from ..config import plugin_config
-from ..models import Rss, FeedEntry
 
 
 @retry(stop=(stop_after_attempt(5) | stop_after_delay(30)))
@@ -22,10 +20,7 @@ async def resize_gif(url: str, resize_ratio: int = 2) -> Optional[bytes]:
     """
     通过 ezgif 压缩 GIF
     """
-    driver: Driver = get_driver()
-    assert isinstance(driver, HTTPClientMixin)
-    request = Request("POST", "https://s3.ezgif.com/resize", data={"new-image-url": url}, timeout=10)
-    response = await driver.request(request)
+    response = await http_client.request("POST", "https://s3.ezgif.com/resize", data={"new-image-url": url})
     data = Pq(response.content)
     next_url = data("form").attr("action")
     _file = data("form > input[type=hidden]:nth-child(1)").attr("value")
@@ -41,8 +36,7 @@ async def resize_gif(url: str, resize_ratio: int = 2) -> Optional[bytes]:
         "method": "gifsicle",
         "ar": "force",
     }
-    request = Request("POST", str(next_url), params="ajax=true", data=next_data, timeout=10)
-    response = await driver.request(request)
+    response = await http_client.request("POST", str(next_url), params="ajax=true", data=next_data)
     data = Pq(response.content)
     output_img_url = "https:" + str(data("img:nth-child(1)").attr("src"))
     return await download_image(output_img_url)
@@ -100,17 +94,10 @@ async def _download_image(url: str, proxy: bool) -> Optional[bytes]:
     """
     referer = f"{URL(url).scheme}://{URL(url).host}/"
     headers = {"referer": referer}
-    driver: Driver = get_driver()
-    assert isinstance(driver, HTTPClientMixin)
-    request = Request(
-        "GET",
-        url,
-        headers=headers,
-        proxy=plugin_config.rss_proxy if proxy else None,
-        timeout=10,
-    )
     try:
-        response = await driver.request(request)
+        response = await http_client.request(
+            "GET", url, headers=headers, proxy=plugin_config.rss_proxy if proxy else None
+        )
         # 如果图片无法获取到，直接返回
         if not response.content:
             logger.error(f"图片[{url}]下载失败！{response.status_code}")
@@ -156,14 +143,18 @@ async def handle_image(url: str, img_proxy: bool, rss: Optional[Rss] = None) ->
     return None
 
 
-async def handle_media(entry: FeedEntry, rss: Rss) -> Tuple[str, List[BytesIO]]:
+async def handle_media(doc: Optional[Pq], rss: Rss) -> Tuple[str, List[BytesIO]]:
     """
     处理 RSS 媒体文件
+
+    参数:
+        doc: 正文解析后的文档，没有正文内容时为 None
+        rss: 订阅实例
     """
-    if rss.max_image_number == 0:
+    if rss.max_image_number == 0 or doc is None:
         # 不发送图片
         return "", []
-    html = Pq(utils.get_summary(entry))
+    html = doc
     message = ""
     images: List[BytesIO] = []
     # 处理图片
@@ -3,10 +3,12 @@ from copy import deepcopy
 from inspect import signature
 from typing import Any, Dict, List, Union, Callable, Optional, TypedDict
 
+from pyquery import PyQuery as Pq
 from nonebot_plugin_saa import MessageFactory, MessageSegmentFactory
 
+from .utils import get_summary
 from ..utils import partition_list
-from ..models import Rss, FeedEntry, FeedParser, FeedChannel
+from ..models import Rss, FeedEntry, FeedParser, FeedChannel, checkpoint, check_session
 
 
 class ParseState(TypedDict):
@@ -50,6 +52,10 @@ class ParseState(TypedDict):
     """
     是否停止解析
     """
+    docs: Dict[int, Optional[Pq]]
+    """
+    各条目正文解析后的文档，按条目的 id() 缓存，同一条目只解析一次
+    """
 
 
 class ParseItem:
@@ -177,6 +183,19 @@ def _handler_filter(_handler_list: List[ParseItem], _url: str) -> List[ParseItem
     return _result
 
 
+def get_doc(state: ParseState, entry: FeedEntry) -> Optional[Pq]:
+    """
+    获取条目正文解析后的文档，首次获取时解析并缓存，没有正文内容时返回 None
+    """
+    key = id(entry)
+    if key not in state["docs"]:
+        try:
+            state["docs"][key] = Pq(get_summary(entry))
+        except Exception:
+            state["docs"][key] = None
+    return state["docs"][key]
+
+
 async def _run_handlers(
     handlers: List[ParseItem],
     rss: Rss,
@@ -185,6 +204,9 @@ async def _run_handlers(
 ) -> ParseState:
     """
     执行处理器
+
+    处理器可声明 `doc` 参数获取当前条目正文解析后的文档；
+    文档由同一条目的所有处理器共享，处理器不得修改，需要修改时先 `doc.clone()`
     """
     for handler in handlers:
         kwargs = {
@@ -194,6 +216,8 @@ async def _run_handlers(
         }
         handler_params = signature(handler.func).parameters
         handler_kwargs = {k: v for k, v in kwargs.items() if k in handler_params}
+        if "doc" in handler_params:
+            handler_kwargs["doc"] = get_doc(state, entry) if entry is not None else None
         state = await handler.func(**handler_kwargs)
         if handler.block or state["stop"]:
             break
@@ -239,25 +263,31 @@ class ParseRss:
             "message": None,
             "text": "",
             "stop": False,
+            "docs": {},
         }
-        # 运行前置处理
-        state = await _run_handlers(self.before_handler, self.rss, state)
-        state["title"] = f"✨ ⌈{model.feed.title}⌋ 更新了!"
-        if new_data := state["new_data"]:
-            # 新增数据逐条处理
-            for entries in partition_list(new_data, 10):
-                # 每次最多处理 10 条数据
-                for entry in entries:
-                    # 处理一条数据
-                    for handler_list in self.handler.values():
-                        # 依次运行处理函数
-                        state = await _run_handlers(handler_list, self.rss, state, entry=entry)
-                    if state["message"] is not None:
-                        state["messages"].append(deepcopy(state["message"]))
-                        state["message"] = None
-                # 运行后置处理 发送消息与写入缓存
+        async with check_session():
+            # 运行前置处理
+            state = await _run_handlers(self.before_handler, self.rss, state)
+            await checkpoint()
+            state["title"] = f"✨ ⌈{model.feed.title}⌋ 更新了!"
+            if new_data := state["new_data"]:
+                # 新增数据逐条处理
+                for entries in partition_list(new_data, 10):
+                    # 每次最多处理 10 条数据
+                    for entry in entries:
+                        # 处理一条数据
+                        for handler_list in self.handler.values():
+                            # 依次运行处理函数
+                            state = await _run_handlers(handler_list, self.rss, state, entry=entry)
+                        if state["message"] is not None:
+                            state["messages"].append(deepcopy(state["message"]))
+                            state["message"] = None
+                        # 释放已处理条目的文档
+                        state["docs"].pop(id(entry), None)
+                    # 运行后置处理 发送消息与写入缓存
+                    await _run_handlers(self.after_handler, self.rss, state)
+                    await checkpoint()
+                    state["messages"] = []
+            else:
+                # 无新推送 直接运行后置处理
                 await _run_handlers(self.after_handler, self.rss, state)
-                state["messages"] = []
-        else:
-            # 无新推送 直接运行后置处理
-            await _run_handlers(self.after_handler, self.rss, state)
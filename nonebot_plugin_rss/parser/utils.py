@@ -11,6 +11,7 @@ from pyquery import PyQuery as Pq
 from PIL import Image, UnidentifiedImageError
 
 from . import media
+from ..config import plugin_config
 from ..models import Rss, Entry, FeedEntry, EntryCache
 
 
@@ -18,42 +19,51 @@ async def check_new(rss: Rss, entries: List[FeedEntry]) -> List[FeedEntry]:
     """
     检查更新的内容
     """
+    if 0 < plugin_config.rss_num_limit < len(entries):
+        # 只检查最新的条目，与内容记录的数量限制保持一致；
+        # 有条目没有发布时间时无法排序，按订阅源的顺序保留最前面的条目
+        if all(entry.published for entry in entries):
+            entries = sorted(entries, key=get_time, reverse=True)
+        entries = entries[: plugin_config.rss_num_limit]
+    new_hashes = await Entry.get_new_hashes(rss.id, entries)
     update: List[FeedEntry] = []
     for entry in entries:
-        if not await Entry.check_exist(rss.id, entry):
+        if (hash := Entry.get_hash(entry)) in new_hashes:
+            # 同一次抓取中的重复条目只保留一条
+            new_hashes.remove(hash)
             update.append(entry)
     update.sort(key=get_time)
     return update
 
 
-async def check_filter(rss: Rss, item: FeedEntry) -> Tuple[bool, Optional[str]]:
+async def check_filter(rss: Rss, item: FeedEntry, doc: Optional[Pq]) -> Tuple[bool, Optional[str]]:
     """
     判断是否去重
+
+    参数:
+        rss: 订阅实例
+        item: 条目
+        doc: 条目正文解析后的文档，没有正文内容时为 None
     """
-    summary = get_summary(item)
-    image_hash = None
     is_or: bool = "or" in rss.filters
     link: Optional[str] = item.link if "link" in rss.filters else None
     title: Optional[str] = item.title if "title" in rss.filters else None
     image_hash: Optional[str] = None
     if "image" in rss.filters:
-        image_hash = await get_image_hash(rss, summary)
+        image_hash = await get_image_hash(rss, doc)
     logger.trace(f"去重检查: {rss.id} {link} {title} {image_hash} {is_or}")
     flag = await EntryCache.check_exist(rss.id, link, title, image_hash, is_or)
     return flag, image_hash
 
 
-async def get_image_hash(rss: Rss, summary: str) -> Optional[str]:
+async def get_image_hash(rss: Rss, doc: Optional[Pq]) -> Optional[str]:
     """
     获取图片的指纹
     """
-    try:
-        summary_doc = Pq(summary)
-    except Exception as e:
-        logger.warning(e)
+    if doc is None:
         # 没有正文内容直接跳过
         return None
-    img_doc = summary_doc("img")
+    img_doc = doc("img")
     # 只处理仅有一张图片的情况
     if len(img_doc) != 1:
         return None
@@ -82,6 +92,13 @@ def get_summary(entry: FeedEntry) -> str:
     return f"<div>{summary}</div>" if re.search("^https?://", summary) else summary
 
 
+def has_image(doc: Optional[Pq], summary: str) -> bool:
+    """
+    正文是否包含图片，包括 HTML 图片与 bbcode 图片
+    """
+    return "[img]" in summary or (doc is not None and bool(doc("img")))
+
+
 def get_author(entry: FeedEntry) -> str:
     """
     获取作者
@@ -0,0 +1,184 @@
+import time
+import asyncio
+import multiprocessing
+from functools import partial
+from contextlib import suppress
+from typing import Tuple, Union, Optional, TypedDict
+from concurrent.futures.process import BrokenProcessPool
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+
+import nonebot
+import feedparser
+from nonebot import get_driver
+from nonebot.log import logger
+
+from .models import FeedParser
+from .stream import parse_stream
+from .config import plugin_config
+
+ParseResult = Tuple[Optional[FeedParser], Optional[str], float, float]
+"""
+解析结果：模型、错误信息、排队等待时间与解析耗时
+"""
+
+
+class ParseStats(TypedDict):
+    """
+    解析池运行统计
+    """
+
+    mode: str
+    """
+    工作方式，process 或 thread
+    """
+    workers: int
+    """
+    工作进程或线程数量
+    """
+    parsed: int
+    """
+    累计解析次数
+    """
+    parse_avg: float
+    """
+    平均解析耗时，单位秒
+    """
+    parse_max: float
+    """
+    最大解析耗时，单位秒
+    """
+    wait_avg: float
+    """
+    平均排队等待时间，单位秒
+    """
+    wait_max: float
+    """
+    最大排队等待时间，单位秒
+    """
+
+
+def parse_feed(content: Union[str, bytes], submitted: float, stream_parse: bool, num_limit: int) -> ParseResult:
+    """
+    解析订阅源内容并校验为模型，在工作进程或线程中执行
+
+    `stream_parse` 为真时优先流式解析，只读取最新的 `num_limit` 个条目，
+    失败（格式错误或包含不支持的内容）时改用 feedparser 解析；
+    只返回校验后的模型，不返回 feedparser 的完整结果，减少进程间传输的数据量
+    """
+    start_time = time.time()
+    model: Optional[FeedParser] = None
+    error: Optional[str] = None
+    if stream_parse:
+        with suppress(Exception):
+            model, _ = parse_stream(content, num_limit)
+    if model is None:
+        data = feedparser.parse(content)
+        try:
+            model = FeedParser.parse_obj(data)
+        except Exception as e:
+            error = repr(e)
+    return model, error, max(start_time - submitted, 0), time.time() - start_time
+
+
+class ParsePool:
+    """
+    订阅源解析池
+
+    将 feedparser 解析与模型校验放到工作进程中执行，避免大体积订阅源阻塞事件循环；
+    主进程运行着事件循环与多个线程，工作进程使用 forkserver（不支持时使用 spawn）启动方式创建，
+    启动时以主进程的配置初始化 NoneBot 后导入插件模块，解析所需的配置作为参数传入；
+    进程数量小于等于 0、创建失败或进程池异常时改用线程池
+    """
+
+    def __init__(self, processes: int):
+        self.processes: int = processes
+        """
+        工作进程数量，小于等于 0 时使用线程池
+        """
+        self._executor: Optional[Executor] = None
+        self._mode: str = "thread"
+        self._parsed: int = 0
+        self._parse_total: float = 0
+        self._parse_max: float = 0
+        self._wait_total: float = 0
+        self._wait_max: float = 0
+
+    def start(self) -> None:
+        """
+        创建工作进程池，失败时改用线程池
+        """
+        if self._executor is not None:
+            return
+        if self.processes > 0:
+            methods = multiprocessing.get_all_start_methods()
+            try:
+                self._executor = ProcessPoolExecutor(
+                    self.processes,
+                    mp_context=multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn"),
+                    # 导入插件模块前需要以主进程的配置初始化 NoneBot
+                    initializer=partial(nonebot.init, **get_driver().config.dict()),
+                )
+                self._mode = "process"
+                return
+            except Exception:
+                logger.exception("创建解析进程池失败，改用线程池")
+        self._use_threads()
+
+    def _use_threads(self) -> None:
+        self._executor = ThreadPoolExecutor(max(self.processes, 1), thread_name_prefix="rss_parse")
+        self._mode = "thread"
+
+    def shutdown(self) -> None:
+        """
+        关闭工作进程池，取消尚未开始的解析
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def parse(self, content: Union[str, bytes]) -> Tuple[Optional[FeedParser], Optional[str]]:
+        """
+        解析订阅源内容
+
+        返回模型与错误信息，解析失败时模型为 None
+        """
+        if self._executor is None:
+            self.start()
+        assert self._executor is not None
+        loop = asyncio.get_running_loop()
+        args = (plugin_config.rss_stream_parse, plugin_config.rss_num_limit)
+        try:
+            result = await loop.run_in_executor(self._executor, parse_feed, content, time.time(), *args)
+        except BrokenProcessPool:
+            logger.exception("解析进程池异常退出，改用线程池")
+            self.shutdown()
+            self._use_threads()
+            result = await loop.run_in_executor(self._executor, parse_feed, content, time.time(), *args)
+        model, error, wait, duration = result
+        self._parsed += 1
+        self._parse_total += duration
+        self._parse_max = max(self._parse_max, duration)
+        self._wait_total += wait
+        self._wait_max = max(self._wait_max, wait)
+        return model, error
+
+    def stats(self) -> ParseStats:
+        """
+        获取解析耗时与排队等待统计
+        """
+        parsed = self._parsed or 1
+        return ParseStats(
+            mode=self._mode,
+            workers=max(self.processes, 1),
+            parsed=self._parsed,
+            parse_avg=self._parse_total / parsed,
+            parse_max=self._parse_max,
+            wait_avg=self._wait_total / parsed,
+            wait_max=self._wait_max,
+        )
+
+
+parse_pool = ParsePool(plugin_config.rss_parse_processes)
+"""
+订阅源解析池
+"""
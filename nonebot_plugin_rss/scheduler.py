@@ -0,0 +1,402 @@
+import re
+import time
+import zlib
+import heapq
+import asyncio
+from itertools import count
+from datetime import datetime
+from typing import Any, Dict, List, Tuple, Union, Callable, Optional, Awaitable
+
+from nonebot.log import logger
+from apscheduler.triggers.cron import CronTrigger
+
+from .models import Rss
+from .config import plugin_config
+from .utils import to_utc_datetime
+from .websub import websub_subscriber
+from .workqueue import FairQueue, QueueStats
+
+
+def is_cron(time_str: str) -> bool:
+    """
+    订阅更新时间是否为 cron 表达式
+    """
+    return bool(re.search(r"[_*/,-]", time_str))
+
+
+def get_trigger(time_str: str) -> Union[float, CronTrigger, None]:
+    """
+    根据订阅更新时间获取触发规则
+
+    返回间隔秒数或 cron 触发器，cron 表达式无效时返回 None
+    """
+    if not is_cron(time_str):
+        # {time_str} 分钟/次
+        return int(time_str) * 60
+    # cron 表达式
+    # https://www.runoob.com/linux/linux-comm-crontab.html
+    cron = time_str.split("_")
+    fields = ["*/5", "*", "*", "*", "*"]
+    for index, value in enumerate(cron):
+        if value:
+            fields[index] = value
+    try:
+        return CronTrigger(
+            minute=fields[0],
+            hour=fields[1],
+            day=fields[2],
+            month=fields[3],
+            day_of_week=fields[4],
+        )
+    except Exception:
+        logger.exception(f"创建定时器错误！cron: {fields}")
+        return None
+
+
+def get_rss_trigger(rss: Rss) -> Union[float, CronTrigger, None]:
+    """
+    获取订阅的触发规则
+
+    开启自动调整且已学习到检查间隔时使用学习到的间隔，已通过 WebSub 推送时间隔不短于兜底检查间隔，
+    cron 表达式不受影响
+    """
+    trigger = get_trigger(rss.time)
+    if trigger is None or isinstance(trigger, CronTrigger):
+        return trigger
+    if rss.adaptive and rss.learned_interval:
+        trigger = float(rss.learned_interval)
+    if websub_subscriber.is_active(rss):
+        trigger = max(trigger, plugin_config.rss_websub_poll_interval * 60)
+    return trigger
+
+
+class FeedJob:
+    """
+    订阅检查任务
+    """
+
+    def __init__(self, rss: Rss, trigger: Union[float, CronTrigger]):
+        self.rss: Rss = rss
+        """
+        订阅实例
+        """
+        self.trigger: Union[float, CronTrigger] = trigger
+        """
+        触发规则，间隔秒数或 cron 触发器
+        """
+        self.phase: float = get_phase(get_phase_key(rss), trigger)
+        """
+        检查相位，单位秒
+        """
+        self.due: float = 0
+        """
+        下次检查时间戳
+        """
+        self.seq: int = 0
+        """
+        在堆中的序号，用于识别失效的堆元素
+        """
+        self.running: bool = False
+        """
+        是否正在检查
+        """
+        self.poll_due: float = 0
+        """
+        按触发规则的下次检查时间戳，处理推送后恢复到此时间
+        """
+        self.pushed: List[bytes] = []
+        """
+        等待处理的推送内容
+        """
+        self.immediate: bool = False
+        """
+        下次检查是否为添加后的立即检查
+        """
+
+    @property
+    def name(self) -> str:
+        return self.rss.name
+
+    def refresh(self) -> None:
+        """
+        按订阅当前的检查间隔更新触发规则，间隔不变时保持原相位
+        """
+        if isinstance(self.trigger, CronTrigger):
+            return
+        trigger = get_rss_trigger(self.rss)
+        if trigger is not None and trigger != self.trigger:
+            self.trigger = trigger
+            self.phase = get_phase(get_phase_key(self.rss), trigger)
+
+    def next_due(self, now: float) -> float:
+        """
+        计算当前时间之后的下次检查时间
+
+        间隔任务的检查时间满足 `due ≡ phase (mod interval)`，错过的检查自然合并为一次；
+        cron 任务在触发时间后延迟 `phase` 秒
+        """
+        if isinstance(self.trigger, CronTrigger):
+            next_time = self.trigger.get_next_fire_time(None, datetime.now(self.trigger.timezone))
+            return next_time.timestamp() + self.phase if next_time else now + 5 * 60
+        return self.phase + ((now - self.phase) // self.trigger + 1) * self.trigger
+
+
+def get_phase_key(rss: Rss) -> str:
+    """
+    获取计算检查相位使用的键
+
+    与合并抓取的键一致（订阅地址、是否使用代理与 cookies），
+    相同订阅源的订阅以相同相位检查，便于在 `rss_fetch_share_ttl` 内复用抓取结果
+    """
+    return f"{rss.get_url()}|{rss.proxy}|{rss.cookie or ''}"
+
+
+def get_phase(key: str, trigger: Union[float, CronTrigger]) -> float:
+    """
+    根据键计算确定的检查相位
+
+    间隔任务的相位均匀分布在整个间隔内，cron 任务的相位分布在触发后的一分钟内
+    """
+    period = 60 if isinstance(trigger, CronTrigger) else trigger
+    return zlib.crc32(key.encode()) % (int(period) * 1000) / 1000 if period > 0 else 0
+
+
+class FeedScheduler:
+    """
+    订阅检查调度器
+
+    所有订阅按下次检查时间放入同一个堆中，到期的订阅分批放入按机器人与订阅目标轮询的公平队列，
+    由固定数量的工作协程执行，每个订阅只占用一个工作协程；
+    添加、删除与重新调度均为 O(log n)，删除时只标记失效，由调度循环跳过
+    """
+
+    def __init__(
+        self,
+        func: Callable[[Rss], Awaitable[Optional[float]]],
+        push_func: Callable[[Rss, bytes], Awaitable[None]],
+        workers: int,
+        batch_size: int,
+        startup_rate: float,
+    ):
+        self.func: Callable[[Rss], Awaitable[Optional[float]]] = func
+        """
+        检查函数，返回值为抓取失败后的重试等待秒数，为 None 时按触发规则调度
+        """
+        self.push_func: Callable[[Rss, bytes], Awaitable[None]] = push_func
+        """
+        推送处理函数，处理 WebSub 推送的订阅源内容
+        """
+        self.workers: int = workers
+        """
+        工作协程数量，即同时检查的订阅数量上限
+        """
+        self.batch_size: int = batch_size
+        """
+        每轮最多派发的订阅数量
+        """
+        self.startup_rate: float = startup_rate
+        """
+        立即检查的速率，单位个/秒，小于等于 0 时不限制
+        """
+        self._ramp: float = 0
+        self._jobs: Dict[str, FeedJob] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._seq = count()
+        self._queue: FairQueue[FeedJob] = FairQueue()
+        self._running: int = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping: bool = False
+        self._tasks: List["asyncio.Task[None]"] = []
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._jobs
+
+    def add(self, rss: Rss, immediate: bool = False, due: Optional[float] = None) -> bool:
+        """
+        添加订阅检查任务，已存在时替换
+
+        参数:
+            rss: 订阅实例
+            immediate: 是否尽快检查一次，按 `startup_rate` 依次排队，此后至少间隔一个周期再按相位检查
+            due: 首次检查时间戳，缺省时按触发规则与相位计算
+        """
+        trigger = get_rss_trigger(rss)
+        if trigger is None:
+            return False
+        self.remove(rss.name)
+        job = FeedJob(rss, trigger)
+        now = time.time()
+        if immediate:
+            job.immediate = True
+            due = self._ramp_slot(now)
+        self._push(job, due if due is not None else job.next_due(now))
+        return True
+
+    def _ramp_slot(self, now: float) -> float:
+        """
+        分配立即检查的时间，使大量订阅的首次检查匀速展开
+        """
+        if self.startup_rate <= 0:
+            return now
+        self._ramp = max(self._ramp, now)
+        due = self._ramp
+        self._ramp += 1 / self.startup_rate
+        return due
+
+    def remove(self, name: str) -> bool:
+        """
+        删除订阅检查任务，并记录按触发规则的下次检查时间，重新添加时据此恢复调度
+        """
+        job = self._jobs.pop(name, None)
+        if job is None:
+            return False
+        job.rss.set_meta(next_check=to_utc_datetime(job.poll_due))
+        if len(self._heap) > 2 * len(self._jobs) + 64:
+            # 失效元素过多时重建堆
+            self._heap = [item for item in self._heap if self._is_valid(item)]
+            heapq.heapify(self._heap)
+        return True
+
+    def push(self, rss: Rss, content: bytes) -> bool:
+        """
+        添加订阅的推送内容，作为立即到期的任务排队处理，处理后恢复原来的检查时间
+
+        订阅不在调度中（如已停止）时返回 False
+        """
+        job = self._jobs.get(rss.name)
+        if job is None or job.rss.id != rss.id:
+            return False
+        job.pushed.append(content)
+        if not job.running:
+            self._push(job, min(job.due, time.time()), poll=False)
+        return True
+
+    def _push(self, job: FeedJob, due: float, poll: bool = True) -> None:
+        job.due = due
+        if poll:
+            job.poll_due = due
+        job.seq = next(self._seq)
+        self._jobs[job.name] = job
+        heapq.heappush(self._heap, (due, job.seq, job.name))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _is_valid(self, item: Tuple[float, int, str]) -> bool:
+        job = self._jobs.get(item[2])
+        return job is not None and job.seq == item[1] and not job.running
+
+    def start(self) -> None:
+        """
+        启动调度循环与工作协程
+        """
+        if self._tasks:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._tasks.append(asyncio.create_task(self._dispatch()))
+        self._tasks.extend(asyncio.create_task(self._work()) for _ in range(self.workers))
+        logger.debug(f"订阅检查调度器已启动，工作协程数量：{self.workers}")
+
+    async def stop(self) -> None:
+        """
+        停止调度循环与工作协程，并记录各订阅按触发规则的下次检查时间，重启后据此恢复调度
+        """
+        # Python 3.11 及以前，与唤醒同时到达的取消会被 wait_for 吞掉，调度循环据此标记退出
+        self._stopping = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._wakeup = None
+        for job in self._jobs.values():
+            job.rss.set_meta(next_check=to_utc_datetime(job.poll_due))
+
+    async def _dispatch(self) -> None:
+        """
+        调度循环：取出到期的订阅分批派发
+        """
+        assert self._wakeup is not None
+        while not self._stopping:
+            now = time.time()
+            batch: List[FeedJob] = []
+            while self._heap and self._heap[0][0] <= now and len(batch) < self.batch_size:
+                item = heapq.heappop(self._heap)
+                if self._is_valid(item):
+                    batch.append(self._jobs[item[2]])
+            for job in batch:
+                job.running = True
+                self._queue.put(job.rss.bot_id, tuple(job.rss.targets), job)
+            if batch:
+                await asyncio.sleep(0)
+                continue
+            timeout = self._heap[0][0] - now if self._heap else None
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _work(self) -> None:
+        """
+        工作协程：执行订阅检查或处理推送，并重新调度
+        """
+        while True:
+            job, wait = await self._queue.get()
+            if wait > 60:
+                logger.warning(f"{job.name} 排队等待了 {wait:.0f}s，可考虑调大 rss_check_workers")
+            self._running += 1
+            start_time = time.time()
+            delay: Optional[float] = None
+            pushed, job.pushed = job.pushed, []
+            try:
+                if pushed:
+                    for content in pushed:
+                        await self.push_func(job.rss, content)
+                else:
+                    delay = await self.func(job.rss)
+            except Exception:
+                logger.exception(f"{job.name} {'处理推送' if pushed else '检查更新'}时出现错误")
+            finally:
+                self._running -= 1
+                job.running = False
+                self._reschedule(job, start_time, delay, polled=not pushed)
+
+    def _reschedule(self, job: FeedJob, start_time: float, delay: Optional[float], polled: bool) -> None:
+        """
+        执行后重新调度：检查后按触发规则与失败退避计算下次检查时间，处理推送后恢复原来的检查时间；
+        期间收到新的推送时立即再次排队
+        """
+        if polled and job.rss.adaptive:
+            # 自动调整检查间隔时据此统计两次检查之间的新条目
+            job.rss.set_meta(last_check=to_utc_datetime(start_time))
+        if self._jobs.get(job.name) is not job:
+            return
+        if not polled:
+            self._push(job, job.poll_due, poll=False)
+        else:
+            job.refresh()
+            now = time.time()
+            due = job.next_due(now)
+            if job.immediate and not isinstance(job.trigger, CronTrigger):
+                # 立即检查后相位对齐的下次检查可能近在眼前，至少间隔一个周期
+                due = max(due, now + job.trigger)
+            job.immediate = False
+            if delay:
+                # 失败退避，不早于正常的下次检查时间
+                due = max(due, now + delay)
+                logger.debug(f"{job.name} 将在 {due - now:.0f}s 后重试")
+            self._push(job, due)
+        if job.pushed:
+            self._push(job, time.time(), poll=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取调度运行统计：订阅数量、正在检查的数量与队列统计
+        """
+        queue_stats: QueueStats = self._queue.stats()
+        return {"jobs": len(self._jobs), "running": self._running, "workers": self.workers, **queue_stats}
@@ -0,0 +1,76 @@
+from typing import List
+
+from nonebot.log import logger
+from nonebot_plugin_apscheduler import scheduler
+from apscheduler.triggers.interval import IntervalTrigger
+
+from . import trigger
+from .pool import parse_pool
+from .config import plugin_config
+from .limiter import host_limiter
+from .cleanup import cleanup_stats
+from .mirror import mirror_manager
+from .websub import websub_subscriber
+
+
+def format_stats() -> str:
+    """
+    汇总调度队列、解析池、主机限流、RSSHub 地址、WebSub 与清理任务的运行统计
+    """
+    queue = trigger.scheduler.stats()
+    parts: List[str] = [
+        f"调度：订阅 {queue['jobs']}，检查中 {queue['running']}/{queue['workers']}，"
+        f"排队 {queue['depth']}（最多 {queue['max_depth']}），"
+        f"等待均值 {queue['wait_avg']:.1f}s 最大 {queue['wait_max']:.1f}s"
+    ]
+    parse = parse_pool.stats()
+    parts.append(
+        f"解析（{parse['mode']} × {parse['workers']}）：{parse['parsed']} 次，"
+        f"耗时均值 {parse['parse_avg']:.2f}s 最大 {parse['parse_max']:.2f}s，"
+        f"等待均值 {parse['wait_avg']:.2f}s 最大 {parse['wait_max']:.2f}s"
+    )
+    # 等待时间最长的主机
+    waited = [(host, stats) for host, stats in host_limiter.stats().items() if stats["waited"]]
+    if waited:
+        waited = sorted(waited, key=lambda item: item[1]["wait_total"], reverse=True)[:3]
+        hosts = [f"{host} 等待 {s['waited']}/{s['requests']} 次，最大 {s['wait_max']:.1f}s" for host, s in waited]
+        parts.append(f"限流：{'，'.join(hosts)}")
+    if mirror_manager.backups:
+        mirrors = "，".join(
+            f"{base} 成功率 {stats['success_rate']:.0%}"
+            + (f" 延迟 {stats['latency']:.2f}s" if stats["latency"] is not None else "")
+            + ("（暂停）" if not mirror_manager.is_healthy(base) else "")
+            for base, stats in mirror_manager.stats().items()
+        )
+        parts.append(f"RSSHub：{mirrors}")
+    websub = websub_subscriber.stats()
+    if websub["enabled"]:
+        parts.append(f"WebSub：订阅 {websub['active']}，推送 {websub['pushes']}，无效签名 {websub['rejected']}")
+    if cleanup_stats:
+        deleted = "，".join(f"{job_id} 累计 {stats['total_deleted']} 条" for job_id, stats in cleanup_stats.items())
+        parts.append(f"清理：{deleted}")
+    return "；".join(parts)
+
+
+async def log_stats() -> None:
+    """
+    输出运行统计
+    """
+    logger.info(f"ELF_RSS 运行统计 {format_stats()}")
+
+
+def add_stats_job() -> None:
+    """
+    添加运行统计定时输出任务，`rss_stats_interval` 小于等于 0 时不添加
+    """
+    if plugin_config.rss_stats_interval <= 0:
+        return
+    scheduler.add_job(
+        func=log_stats,  # 定时任务
+        trigger=IntervalTrigger(minutes=plugin_config.rss_stats_interval),  # 触发器
+        id="RSS_LOG_STATS",  # 任务 ID
+        max_instances=1,  # 最大并发
+        coalesce=True,  # 合并所有错过的 Job
+        replace_existing=True,  # 替换同名任务
+    )
+    logger.debug("定时任务 RSS_LOG_STATS 添加成功")
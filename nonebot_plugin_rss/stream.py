@@ -0,0 +1,224 @@
+from contextlib import suppress
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Tuple, Union, Optional
+from xml.etree.ElementTree import Element, XMLPullParser
+
+import arrow
+from feedparser.sanitizer import _sanitize_html
+
+from .models import FeedParser
+
+CHUNK_SIZE = 64 * 1024
+"""
+每次送入解析器的数据大小
+"""
+
+CHANNEL_TAGS = {"channel", "feed"}
+ENTRY_TAGS = {"item", "entry"}
+CHANNEL_FIELDS = {
+    "title": "title",
+    "description": "subtitle",
+    "subtitle": "subtitle",
+    "tagline": "subtitle",
+    "language": "language",
+    "generator": "generator",
+    "pubDate": "published",
+    "ttl": "ttl",
+}
+"""
+订阅源元素与 FeedChannel 字段的对应关系
+"""
+CHANNEL_LINKS = {"hub": "hub", "self": "self_link"}
+"""
+订阅源链接类型与 FeedChannel 字段的对应关系
+"""
+
+
+def _local_name(tag: str) -> str:
+    """
+    去除元素名中的命名空间
+    """
+    return tag.rsplit("}", 1)[-1]
+
+
+def _text(elem: Element) -> str:
+    """
+    获取元素文本，与 feedparser 一致去除首尾空白
+
+    包含子元素（如 xhtml 内容）时无法还原，抛出异常交由 feedparser 处理
+    """
+    if len(elem):
+        raise ValueError(f"不支持含子元素的 {elem.tag}")
+    return elem.text.strip() if elem.text else ""
+
+
+def _timestamp(date: Optional[str]) -> Optional[float]:
+    """
+    解析条目的发布时间，支持 RFC 822 与 ISO 8601 格式，无法解析时返回 None
+    """
+    if not date:
+        return None
+    with suppress(Exception):
+        return parsedate_to_datetime(date).timestamp()
+    with suppress(Exception):
+        # datetime.fromisoformat 在 Python 3.11 前不支持结尾的 Z
+        return arrow.get(date).timestamp()
+    return None
+
+
+def _is_alternate(elem: Element) -> bool:
+    """
+    是否为 Atom 的正文链接
+    """
+    return elem.get("rel", "alternate") == "alternate" and bool(elem.get("href"))
+
+
+class StreamParser:
+    """
+    流式订阅源解析器
+
+    按块接收订阅源内容，只提取 FeedChannel 与 FeedEntry 需要的字段，
+    已处理的条目元素随即释放，内存占用与订阅源大小无关；
+    订阅源通常按时间倒序排列，读取到 `limit` 个条目后停止，保留的是最新的条目；
+    此时前 `limit` 个条目按时间正序排列则继续读取，只保留最后的 `limit` 个条目。
+    遇到不支持的内容或格式错误时抛出异常，由调用方改用 feedparser 解析
+    """
+
+    def __init__(self, limit: int = 0):
+        self.limit: int = limit
+        """
+        最多解析的条目数量，小于等于 0 时不限制
+        """
+        self.done: bool = False
+        """
+        是否已读取足够的条目
+        """
+        self.ascending: bool = False
+        """
+        订阅源是否按时间正序排列，达到条目上限时判断
+        """
+        self._parser = XMLPullParser(events=("start", "end"))
+        self._path: List[str] = []
+        self._channel: Dict[str, Any] = {}
+        self._entry: Optional[Dict[str, Any]] = None
+        self._entries: List[Dict[str, Any]] = []
+
+    def feed(self, data: Union[str, bytes]) -> bool:
+        """
+        送入一块数据，返回是否已读取足够的条目
+        """
+        if self.done:
+            return True
+        self._parser.feed(data)
+        for event, elem in self._parser.read_events():
+            assert isinstance(elem, Element)
+            if event == "start":
+                self._start(elem)
+            else:
+                self._end(elem)
+            if self.done:
+                break
+        return self.done
+
+    def close(self) -> FeedParser:
+        """
+        结束解析并返回校验后的模型
+        """
+        if not self.done:
+            self._parser.close()
+        return FeedParser.parse_obj({"feed": self._channel, "entries": self._entries})
+
+    def _start(self, elem: Element) -> None:
+        name = _local_name(elem.tag)
+        self._path.append(name)
+        if name in ENTRY_TAGS and self._entry is None:
+            self._entry = {}
+
+    def _end(self, elem: Element) -> None:
+        name = self._path.pop()
+        parent = self._path[-1] if self._path else ""
+        if self._entry is not None:
+            if name in ENTRY_TAGS:
+                self._end_entry(elem)
+            elif parent in ENTRY_TAGS or (name == "name" and parent == "author"):
+                self._entry_field(name, parent, elem)
+        elif parent in CHANNEL_TAGS:
+            self._channel_field(name, elem)
+        if name in ENTRY_TAGS or parent in CHANNEL_TAGS:
+            # 释放已处理的元素
+            elem.clear()
+
+    def _channel_field(self, name: str, elem: Element) -> None:
+        if name == "link" and elem.get("rel") in CHANNEL_LINKS:
+            # WebSub 的 hub 与 self 链接
+            href = elem.get("href")
+            self._channel.setdefault(CHANNEL_LINKS[elem.get("rel", "")], href) if href else None
+        elif name == "link":
+            # RSS 的链接为文本，Atom 的链接为 href 属性
+            link = elem.get("href") if _is_alternate(elem) else _text(elem)
+            self._channel.setdefault("link", link) if link else None
+        elif name in CHANNEL_FIELDS and (name != "ttl" or _text(elem)):
+            self._channel.setdefault(CHANNEL_FIELDS[name], _text(elem))
+
+    def _entry_field(self, name: str, parent: str, elem: Element) -> None:
+        assert self._entry is not None
+        entry = self._entry
+        if parent == "author":
+            # Atom 作者
+            entry.setdefault("author", _text(elem))
+        elif name == "link":
+            link = elem.get("href") if elem.get("href") is not None else _text(elem)
+            if link and (elem.get("href") is None or _is_alternate(elem)):
+                entry.setdefault("link", link)
+        elif name in {"guid", "id"}:
+            # 与 feedparser 一致，没有链接时使用永久链接形式的 guid 或 Atom id
+            if elem.get("isPermaLink", elem.get("ispermalink", "true")) == "true" and (guid := _text(elem)):
+                entry.setdefault("guid", guid)
+        elif name in {"title", "published", "issued", "pubDate"}:
+            key = "title" if name == "title" else "published"
+            entry.setdefault(key, _text(elem))
+        elif name in {"author", "creator"} and not len(elem):
+            entry.setdefault("author", _text(elem))
+        elif name in {"description", "summary"}:
+            entry["summary"] = _text(elem)
+        elif name in {"encoded", "content"}:
+            entry["content"] = _text(elem)
+
+    def _end_entry(self, elem: Element) -> None:
+        assert self._entry is not None
+        entry, self._entry = self._entry, None
+        summary = entry.pop("summary", None) or entry.pop("content", None)
+        if summary and "<" in summary:
+            # 与 feedparser 一致，清理正文中的脚本等不安全内容
+            summary = _sanitize_html(summary, "utf-8", "text/html")
+        if "link" not in entry and "guid" in entry:
+            entry["link"] = entry["guid"]
+        self._entries.append(
+            {
+                "title": entry.get("title"),
+                "link": entry.get("link"),
+                "summary": summary,
+                "author": entry.get("author"),
+                "published": entry.get("published"),
+            }
+        )
+        if self.ascending:
+            # 按时间正序排列时只保留最后的条目
+            del self._entries[0]
+        elif 0 < self.limit <= len(self._entries):
+            first, last = _timestamp(self._entries[0]["published"]), _timestamp(self._entries[-1]["published"])
+            self.ascending = first is not None and last is not None and first < last
+            self.done = not self.ascending
+
+
+def parse_stream(content: Union[str, bytes], limit: int = 0) -> Tuple[FeedParser, bool]:
+    """
+    流式解析订阅源内容
+
+    返回模型以及是否因达到条目上限而提前结束，按时间正序排列的订阅源总是读取到末尾
+    """
+    parser = StreamParser(limit)
+    for start in range(0, len(content), CHUNK_SIZE):
+        if parser.feed(content[start : start + CHUNK_SIZE]):
+            break
+    return parser.close(), parser.done
@@ -1,114 +1,71 @@
-import re
+import time
 import asyncio
+from typing import Optional
 
 from nonebot.log import logger
 from async_timeout import timeout
-from nonebot_plugin_apscheduler import scheduler
-from apscheduler.triggers.cron import CronTrigger
-from apscheduler.triggers.interval import IntervalTrigger
-from apscheduler.executors.pool import ThreadPoolExecutor, ProcessPoolExecutor
 
 from . import executor
 from .models import Rss
+from .utils import to_timestamp
+from .config import plugin_config
+from .scheduler import FeedScheduler, is_cron
 
 
-async def check_update(rss: Rss):
+async def check_update(rss: Rss) -> Optional[float]:
     """
     检测指定 RSS 更新
+
+    返回抓取失败时建议的重试等待秒数
     """
     logger.debug(f"{rss.name} 检查更新")
     try:
-        wait_for = 5 * 60 if re.search(r"[_*/,-]", rss.time) else int(rss.time) * 60
+        wait_for = 5 * 60 if is_cron(rss.time) else int(rss.time) * 60
         async with timeout(wait_for):
-            await executor.start(rss)
+            return await executor.start(rss)
     except asyncio.TimeoutError:
         logger.error(f"{rss.name} 检查更新超时，结束此次任务!")
+        return None
+
+
+scheduler = FeedScheduler(
+    check_update,
+    executor.handle_push,
+    workers=plugin_config.rss_check_workers,
+    batch_size=plugin_config.rss_dispatch_batch_size,
+    startup_rate=plugin_config.rss_startup_rate,
+)
+"""
+订阅检查调度器
+"""
 
 
 def delete_job(rss: Rss) -> None:
     """
     删除指定 RSS 的定时任务
     """
-    if scheduler.get_job(f"RSS_{rss.name}"):
-        scheduler.remove_job(f"RSS_{rss.name}")
+    if scheduler.remove(rss.name):
         logger.debug(f"定时任务 RSS_{rss.name} 删除成功")
 
 
-async def add_job(rss: Rss) -> None:
+async def add_job(rss: Rss, resume: bool = False) -> None:
     """
     添加指定 RSS 的定时任务
 
-    添加后立即执行一次
+    添加后尽快执行一次，大量添加时按 `rss_startup_rate` 匀速展开
+
+    参数:
+        rss: 订阅实例
+        resume: 是否按上次保存的下次检查时间恢复调度，仅在已到期时立即执行
     """
     if rss.id is None:
         rss = await rss.update()
     delete_job(rss)
-    if rss.targets:
-        _add_job(rss)
-        # 后台执行检查更新
-        asyncio.create_task(check_update(rss))
-
-
-def _add_job(rss: Rss) -> None:
-    """
-    添加指定 RSS 的定时任务
-    """
-    if re.search(r"[_*/,-]", rss.time):
-        # 处理 cron 定时任务
-        _add_cron_job(rss)
-        return
-    # {rss.time} 分钟/次 触发器
-    trigger = IntervalTrigger(minutes=int(rss.time), jitter=10)
-    # 添加任务
-    scheduler.add_job(
-        func=check_update,  # 定时任务
-        trigger=trigger,  # 触发器
-        args=(rss,),  # 参数列表
-        id=f"RSS_{rss.name}",  # 任务 ID
-        misfire_grace_time=30,  # 允许的误差时间
-        max_instances=1,  # 最大并发
-        default=ThreadPoolExecutor(64),  # 最大线程
-        processpool=ProcessPoolExecutor(8),  # 最大进程
-        coalesce=True,  # 合并所有错过的 Job
-    )
-    logger.debug(f"定时任务 RSS_{rss.name} 添加成功")
-
-
-# cron 表达式
-# https://www.runoob.com/linux/linux-comm-crontab.html
-
-
-def _add_cron_job(rss: Rss) -> None:
-    """
-    添加指定 RSS 的 cron 定时任务
-    """
-    cron = rss.time.split("_")
-    time = ["*/5", "*", "*", "*", "*"]
-    for index, value in enumerate(cron):
-        if value:
-            time[index] = value
-    try:
-        # 制作一个触发器
-        trigger = CronTrigger(
-            minute=time[0],
-            hour=time[1],
-            day=time[2],
-            month=time[3],
-            day_of_week=time[4],
-        )
-    except Exception:
-        logger.exception(f"创建定时器错误！cron: {time}")
+    if not rss.targets:
         return
-    # 添加任务
-    scheduler.add_job(
-        func=check_update,  # 定时任务
-        trigger=trigger,  # 触发器
-        args=(rss,),  # 参数列表
-        id=f"RSS_{rss.name}",  # 任务 ID
-        misfire_grace_time=30,  # 允许的误差时间
-        max_instances=1,  # 最大并发
-        default=ThreadPoolExecutor(64),  # 最大线程
-        processpool=ProcessPoolExecutor(8),  # 最大进程
-        coalesce=True,  # 合并所有错过的 Job
-    )
-    logger.debug(f"定时任务 RSS_{rss.name} 添加成功")
+    if resume and rss.next_check and (due := to_timestamp(rss.next_check)) > time.time():
+        added = scheduler.add(rss, due=due)
+    else:
+        added = scheduler.add(rss, immediate=True)
+    if added:
+        logger.debug(f"定时任务 RSS_{rss.name} 添加成功")
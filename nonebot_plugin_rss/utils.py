@@ -2,6 +2,8 @@ import re
 import math
 import functools
 from contextlib import suppress
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from typing import Any, Dict, List, Mapping, TypeVar, Optional, Generator
 
 from cachetools.keys import hashkey
@@ -21,6 +23,39 @@ def get_cache_headers(
     return {"Last-Modified": None, "ETag": None}
 
 
+def get_retry_after(headers: Optional[Mapping[str, Any]]) -> Optional[float]:
+    """
+    从响应头中获取 Retry-After 要求的等待秒数
+
+    支持秒数与 HTTP 日期两种格式，无法解析时返回 None
+    """
+    if not headers or not (value := headers.get("Retry-After")):
+        return None
+    value = str(value).strip()
+    if value.isdigit():
+        return float(value)
+    with suppress(Exception):
+        retry_time = parsedate_to_datetime(value)
+        if retry_time.tzinfo is None:
+            retry_time = retry_time.replace(tzinfo=timezone.utc)
+        return max((retry_time - datetime.now(timezone.utc)).total_seconds(), 0)
+    return None
+
+
+def to_utc_datetime(timestamp: float) -> datetime:
+    """
+    将时间戳转换为不带时区的 UTC 时间，用于写入数据库
+    """
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None)
+
+
+def to_timestamp(utc_datetime: datetime) -> float:
+    """
+    将数据库中不带时区的 UTC 时间转换为时间戳
+    """
+    return utc_datetime.replace(tzinfo=timezone.utc).timestamp()
+
+
 def convert_size(size: int) -> str:
     """
     将文件大小转换为可读的字符串
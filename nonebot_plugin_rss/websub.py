@@ -0,0 +1,267 @@
+import hmac
+import time
+import asyncio
+import secrets
+from typing import Any, Set, Dict, Tuple, Optional, Coroutine
+
+from nonebot.log import logger
+from nonebot.drivers import URL, Driver, Request, Response, ReverseDriver, HTTPServerSetup
+
+from .http import http_client
+from .config import plugin_config
+from .models import Rss, FeedChannel
+from .utils import to_timestamp, to_utc_datetime
+
+CALLBACK_PATH = "/elf_rss/websub"
+"""
+WebSub 回调路径，通过查询参数 `id` 区分订阅
+"""
+VERIFY_TIMEOUT = 10 * 60
+"""
+发送订阅请求后等待 hub 验证的时间，超时后允许重新订阅，单位秒
+"""
+RETRY_DELAY = 60 * 60
+"""
+订阅请求失败后的重试等待时间，单位秒
+"""
+SIGNATURE_METHODS = {"sha1", "sha256", "sha384", "sha512"}
+"""
+支持的推送内容签名算法
+"""
+
+
+def verify_signature(secret: str, content: bytes, signature: str) -> bool:
+    """
+    校验推送内容的 `X-Hub-Signature` 签名，格式为 `算法=十六进制摘要`
+    """
+    method, _, digest = signature.partition("=")
+    if method.lower() not in SIGNATURE_METHODS or not digest:
+        return False
+    expected = hmac.new(secret.encode(), content, method.lower()).hexdigest()
+    return hmac.compare_digest(expected, digest.strip().lower())
+
+
+class WebSubSubscriber:
+    """
+    WebSub 订阅者
+
+    抓取成功后检测订阅源声明的 hub，向 hub 订阅并在 NoneBot 的 HTTP 服务上接收验证与推送；
+    推送内容校验签名后作为立即到期的任务交由调度器排队处理，
+    已确认订阅的订阅源改为按 `rss_websub_poll_interval` 兜底轮询；
+    租期过半时在检查更新后续订，订阅源不再声明 hub 时恢复正常轮询
+    """
+
+    def __init__(self, callback_base: Optional[str], lease: int):
+        self.callback_base: Optional[str] = callback_base.rstrip("/") if callback_base else None
+        """
+        回调地址前缀
+        """
+        self.lease: int = lease
+        """
+        请求的租期，单位秒
+        """
+        self.enabled: bool = False
+        """
+        是否已注册回调路由
+        """
+        self._subscribers: Dict[int, Rss] = {}
+        self._unsubscribing: Set[Tuple[int, str]] = set()
+        self._retry_at: Dict[int, float] = {}
+        self._tasks: Set["asyncio.Task[Any]"] = set()
+        self._pushes: int = 0
+        self._rejected: int = 0
+
+    def setup(self, driver: Driver) -> bool:
+        """
+        在 NoneBot 的 HTTP 服务上注册回调路由，未配置回调地址或驱动器不支持时不启用
+        """
+        if self.callback_base is None:
+            return False
+        if not isinstance(driver, ReverseDriver):
+            logger.warning("WebSub 推送需要支持服务端的驱动器（如 FastAPI），已改为轮询")
+            return False
+        driver.setup_http_server(HTTPServerSetup(URL(CALLBACK_PATH), "GET", "elf_rss_websub_verify", self._verify))
+        driver.setup_http_server(HTTPServerSetup(URL(CALLBACK_PATH), "POST", "elf_rss_websub_push", self._push))
+        self.enabled = True
+        return True
+
+    def callback_url(self, rss: Rss) -> str:
+        """
+        获取订阅的回调地址
+        """
+        return f"{self.callback_base}{CALLBACK_PATH}?id={rss.id}"
+
+    def is_active(self, rss: Rss) -> bool:
+        """
+        订阅是否已被 hub 确认且未到期
+        """
+        return (
+            self.enabled
+            and bool(rss.hub and rss.hub_expires)
+            and to_timestamp(rss.hub_expires) > time.time()  # type: ignore
+        )
+
+    def update(self, rss: Rss, feed: Optional[FeedChannel]) -> None:
+        """
+        检查更新后按需订阅或续订
+
+        参数:
+            rss: 订阅实例
+            feed: 订阅源信息，订阅源未更新时为 None，此时按已保存的 hub 续订
+        """
+        if not self.enabled or not rss.id:
+            return
+        self._subscribers[rss.id] = rss
+        if feed is not None and not feed.hub:
+            if rss.hub:
+                logger.info(f"{rss.name} 的订阅源不再声明 hub，恢复轮询")
+                rss.set_meta(hub=None, hub_topic=None, hub_expires=None)
+            return
+        hub = feed.hub if feed is not None else rss.hub
+        topic = (feed.self_link or rss.get_url()) if feed is not None else rss.hub_topic
+        if not hub or not topic:
+            return
+        if (hub, topic) == (rss.hub, rss.hub_topic) and rss.hub_expires:
+            if to_timestamp(rss.hub_expires) - time.time() > self.lease / 2:
+                return
+        if self._retry_at.get(rss.id, 0) > time.time():
+            return
+        self._retry_at[rss.id] = time.time() + VERIFY_TIMEOUT
+        self._spawn(self.subscribe(rss, hub, topic))
+
+    async def subscribe(self, rss: Rss, hub: str, topic: str) -> bool:
+        """
+        向 hub 发送订阅请求，hub 随后通过回调验证订阅意图
+        """
+        values: Dict[str, Any] = {"hub": hub, "hub_topic": topic, "hub_secret": rss.hub_secret or secrets.token_hex(32)}
+        if (hub, topic) != (rss.hub, rss.hub_topic):
+            values["hub_expires"] = None
+        rss.set_meta(**values)
+        if not await self._request(rss, "subscribe", hub, topic):
+            self._retry_at[rss.id] = time.time() + RETRY_DELAY
+            return False
+        return True
+
+    def unsubscribe(self, rss: Rss) -> None:
+        """
+        订阅删除前向 hub 取消订阅，验证时订阅已标记为取消中或已不存在即确认
+        """
+        rss = self._subscribers.pop(rss.id, rss)
+        self._retry_at.pop(rss.id, None)
+        if self.enabled and rss.hub and rss.hub_topic:
+            # 先标记为取消中，hub 的验证可能在订阅从数据库删除前到达
+            self._unsubscribing.add((rss.id, rss.hub_topic))
+            self._spawn(self._unsubscribe(rss, rss.hub, rss.hub_topic))
+
+    async def _unsubscribe(self, rss: Rss, hub: str, topic: str) -> None:
+        if not await self._request(rss, "unsubscribe", hub, topic):
+            self._unsubscribing.discard((rss.id, topic))
+
+    async def _request(self, rss: Rss, mode: str, hub: str, topic: str) -> bool:
+        data = {"hub.callback": self.callback_url(rss), "hub.mode": mode, "hub.topic": topic}
+        if mode == "subscribe":
+            data.update({"hub.lease_seconds": str(self.lease), "hub.secret": rss.hub_secret or ""})
+        try:
+            response = await http_client.request(
+                "POST", hub, data=data, proxy=plugin_config.rss_proxy if rss.proxy else None
+            )
+        except Exception as e:
+            logger.warning(f"{rss.name} 向 hub {hub} 发送 {mode} 请求失败！{repr(e)}")
+            return False
+        if not 200 <= response.status_code < 300:
+            logger.warning(f"{rss.name} 向 hub {hub} 发送 {mode} 请求失败！状态码 {response.status_code}")
+            return False
+        logger.debug(f"{rss.name} 已向 hub {hub} 发送 {mode} 请求，等待验证")
+        return True
+
+    def _spawn(self, coro: Coroutine[Any, Any, Any]) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _get_rss(self, rss_id: str) -> Optional[Rss]:
+        """
+        根据回调地址中的 ID 获取订阅，优先使用检查更新中的实例
+        """
+        if not rss_id.isdigit():
+            return None
+        return self._subscribers.get(int(rss_id)) or await Rss.get_rss_by_id(int(rss_id))
+
+    async def _verify(self, request: Request) -> Response:
+        """
+        处理 hub 的订阅意图验证
+        """
+        query = request.url.query
+        mode, topic, challenge = query.get("hub.mode"), query.get("hub.topic"), query.get("hub.challenge")
+        rss_id = query.get("id", "")
+        if mode == "unsubscribe" and rss_id.isdigit() and (int(rss_id), topic) in self._unsubscribing:
+            if challenge is None:
+                return Response(404)
+            self._unsubscribing.discard((int(rss_id), topic))  # type: ignore
+            return Response(200, headers={"Content-Type": "text/plain"}, content=challenge)
+        rss = await self._get_rss(rss_id)
+        if mode == "denied":
+            if rss is not None and rss.hub_topic == topic:
+                logger.warning(f"{rss.name} 的 WebSub 订阅被 hub 拒绝：{query.get('hub.reason', '')}")
+                rss.set_meta(hub=None, hub_topic=None, hub_expires=None)
+            return Response(200)
+        if mode == "subscribe":
+            confirmed = rss is not None and not rss.stop and rss.hub_topic == topic
+        else:
+            # 订阅已删除或已改为其他 topic 时确认取消订阅
+            confirmed = mode == "unsubscribe" and (rss is None or rss.hub_topic != topic)
+        if not confirmed or challenge is None:
+            return Response(404)
+        if mode == "subscribe":
+            assert rss is not None
+            lease = query.get("hub.lease_seconds", "")
+            lease_seconds = int(lease) if lease.isdigit() else self.lease
+            rss.set_meta(hub_expires=to_utc_datetime(time.time() + lease_seconds))
+            self._retry_at.pop(rss.id, None)
+            logger.info(f"{rss.name} 的 WebSub 订阅已确认，租期 {lease_seconds}s")
+        return Response(200, headers={"Content-Type": "text/plain"}, content=challenge)
+
+    async def _push(self, request: Request) -> Response:
+        """
+        处理 hub 推送的订阅源内容
+        """
+        from .trigger import scheduler
+
+        rss = await self._get_rss(request.url.query.get("id", ""))
+        if rss is None or not rss.hub_secret:
+            # 订阅已不存在，hub 可据此终止推送
+            return Response(410)
+        content = request.content or b""
+        if isinstance(content, str):
+            content = content.encode()
+        if not verify_signature(rss.hub_secret, content, request.headers.get("X-Hub-Signature", "")):
+            # 签名无效时仍返回成功，避免 hub 重试
+            self._rejected += 1
+            logger.warning(f"{rss.name} 收到签名无效的 WebSub 推送，已忽略")
+            return Response(202)
+        # 作为立即到期的任务交由调度器排队处理，受工作协程数量限制
+        if not scheduler.push(rss, content):
+            logger.debug(f"{rss.name} 未在调度中，忽略 WebSub 推送")
+            return Response(202)
+        self._pushes += 1
+        return Response(202)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取推送统计：已确认的订阅数量、收到的推送数量与签名无效的推送数量
+        """
+        return {
+            "enabled": self.enabled,
+            "active": sum(self.is_active(rss) for rss in self._subscribers.values()),
+            "pushes": self._pushes,
+            "rejected": self._rejected,
+        }
+
+
+websub_subscriber = WebSubSubscriber(
+    str(plugin_config.rss_websub_callback_base) if plugin_config.rss_websub_callback_base else None,
+    lease=plugin_config.rss_websub_lease * 24 * 60 * 60,
+)
+"""
+WebSub 订阅者
+"""
@@ -0,0 +1,105 @@
+import time
+import asyncio
+from collections import OrderedDict, deque
+from typing import Deque, Tuple, Generic, TypeVar, Hashable, Optional, TypedDict
+
+T = TypeVar("T")
+
+
+class QueueStats(TypedDict):
+    """
+    队列运行统计
+    """
+
+    depth: int
+    """
+    当前排队数量
+    """
+    max_depth: int
+    """
+    历史最大排队数量
+    """
+    dispatched: int
+    """
+    累计出队数量
+    """
+    wait_avg: float
+    """
+    平均等待时间，单位秒
+    """
+    wait_max: float
+    """
+    最大等待时间，单位秒
+    """
+
+
+class FairQueue(Generic[T]):
+    """
+    公平队列
+
+    按一级键（如机器人）轮询，同一一级键下再按二级键（如订阅目标）轮询，
+    避免某个机器人或目标的大量任务占满所有工作协程
+    """
+
+    def __init__(self):
+        self._queues: "OrderedDict[Hashable, OrderedDict[Hashable, Deque[Tuple[float, T]]]]" = OrderedDict()
+        self._size: int = 0
+        self._event: Optional[asyncio.Event] = None
+        self._max_depth: int = 0
+        self._dispatched: int = 0
+        self._wait_total: float = 0
+        self._wait_max: float = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def put(self, key: Hashable, sub_key: Hashable, item: T) -> None:
+        """
+        放入任务
+        """
+        groups = self._queues.setdefault(key, OrderedDict())
+        groups.setdefault(sub_key, deque()).append((time.monotonic(), item))
+        self._size += 1
+        self._max_depth = max(self._max_depth, self._size)
+        if self._event is not None:
+            self._event.set()
+
+    async def get(self) -> Tuple[T, float]:
+        """
+        取出任务，返回任务与排队等待时间
+        """
+        if self._event is None:
+            self._event = asyncio.Event()
+        while not self._queues:
+            self._event.clear()
+            await self._event.wait()
+        key, groups = next(iter(self._queues.items()))
+        sub_key, queue = next(iter(groups.items()))
+        enqueued, item = queue.popleft()
+        # 轮询：取出后移到队尾，空队列直接删除
+        if queue:
+            groups.move_to_end(sub_key)
+        else:
+            del groups[sub_key]
+        if groups:
+            self._queues.move_to_end(key)
+        else:
+            del self._queues[key]
+        self._size -= 1
+        wait = time.monotonic() - enqueued
+        self._dispatched += 1
+        self._wait_total += wait
+        self._wait_max = max(self._wait_max, wait)
+        return item, wait
+
+    def stats(self) -> QueueStats:
+        """
+        获取队列运行统计
+        """
+        return {
+            "depth": self._size,
+            "max_depth": self._max_depth,
+            "dispatched": self._dispatched,
+            "wait_avg": self._wait_total / self._dispatched if self._dispatched else 0,
+            "wait_max": self._wait_max,
+        }
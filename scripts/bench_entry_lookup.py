@@ -0,0 +1,144 @@
+"""
+Entry 查重查询基准测试
+
+向临时 SQLite 数据库写入不同数量的内容记录，分别在有无 (rss_id, hash) 索引时
+测量 `Entry.get_new_hashes` 的耗时，验证查询延迟不随记录数量增长。
+
+用法:
+    python scripts/bench_entry_lookup.py
+    python scripts/bench_entry_lookup.py --sizes 10000 100000 1000000 --feeds 1000 --repeat 20
+"""
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+from hashlib import md5
+from typing import List
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+INDEX_NAME = "ix_nonebot_plugin_rss_entry_rss_id_hash"
+INSERT_BATCH = 10000
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Entry 查重查询基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10**4, 10**5, 10**6], help="记录数量")
+    parser.add_argument("--feeds", type=int, default=1000, help="记录分布的订阅数量")
+    parser.add_argument("--batch", type=int, default=50, help="每次查询的条目数量，一半为已存在的条目")
+    parser.add_argument("--repeat", type=int, default=20, help="每种情况的查询次数")
+    return parser.parse_args()
+
+
+def setup(database: Path) -> None:
+    """
+    初始化 NoneBot 并加载插件，关闭内存索引以直接测量数据库查询
+    """
+    import nonebot
+
+    nonebot.init(
+        driver="~none",
+        sqlalchemy_database_url=f"sqlite+aiosqlite:///{database}",
+        localstore_data_dir=str(database.parent / "data"),
+        localstore_cache_dir=str(database.parent / "cache"),
+        localstore_config_dir=str(database.parent / "config"),
+        rss_seen_cache_size=0,
+        log_level="WARNING",
+    )
+    nonebot.load_plugin("nonebot_plugin_rss")
+
+
+async def create_tables() -> None:
+    import nonebot_plugin_orm as orm
+    from nonebot_plugin_orm import Model
+
+    orm._init_orm()
+    async with orm._engines[""].begin() as conn:
+        await conn.run_sync(Model.metadata.create_all)
+
+
+def get_hash(i: int) -> str:
+    """
+    与 `Entry.get_hash` 一致的指纹，避免为每条记录构造 FeedEntry
+    """
+    return md5(f"t{i}https://example.com/{i}None".encode()).hexdigest()
+
+
+async def fill(start: int, stop: int, feeds: int) -> None:
+    """
+    写入第 `start` 到 `stop` 条记录，按序号轮流分配给各订阅
+    """
+    from sqlalchemy import insert
+    from nonebot_plugin_orm import get_session
+
+    from nonebot_plugin_rss.models import Entry
+
+    async with get_session() as session:
+        for offset in range(start, stop, INSERT_BATCH):
+            values = [
+                {"rss_id": i % feeds + 1, "title": f"t{i}", "link": f"https://example.com/{i}", "hash": get_hash(i)}
+                for i in range(offset, min(offset + INSERT_BATCH, stop))
+            ]
+            await session.execute(insert(Entry), values)
+        await session.commit()
+
+
+async def set_index(enabled: bool) -> None:
+    from sqlalchemy import text
+    from nonebot_plugin_orm import get_session
+
+    async with get_session() as session:
+        if enabled:
+            await session.execute(
+                text(f"CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON nonebot_plugin_rss_entry (rss_id, hash)")
+            )
+        else:
+            await session.execute(text(f"DROP INDEX IF EXISTS {INDEX_NAME}"))
+        await session.commit()
+
+
+async def measure(size: int, feeds: int, batch: int, repeat: int) -> List[float]:
+    """
+    测量查询耗时，单位毫秒；每次查询一半已存在、一半不存在的条目
+    """
+    from nonebot_plugin_rss.models import Entry, FeedEntry
+
+    durations: List[float] = []
+    for index in range(repeat):
+        rss_id = index % feeds + 1
+        # 属于该订阅的已存在记录序号
+        existing = range(rss_id - 1, size, feeds)[: batch // 2]
+        entries = [FeedEntry(title=f"t{i}", link=f"https://example.com/{i}") for i in existing]
+        entries += [FeedEntry(title=f"new{index}-{i}", link=f"https://example.com/new/{i}") for i in range(batch)]
+        entries = entries[:batch]
+        start_time = time.perf_counter()
+        new_hashes = await Entry.get_new_hashes(rss_id, entries)
+        durations.append((time.perf_counter() - start_time) * 1000)
+        assert len(new_hashes) == len(entries) - len(existing), "已存在的条目未被识别"
+    return durations
+
+
+async def main(args: argparse.Namespace) -> None:
+    await create_tables()
+    filled = 0
+    print(f"{'rows':>10} {'index':>6} {'median ms':>10} {'p95 ms':>8}")  # noqa: T201
+    for size in sorted(args.sizes):
+        await fill(filled, size, args.feeds)
+        filled = size
+        for enabled in (True, False):
+            await set_index(enabled)
+            durations = sorted(await measure(size, args.feeds, args.batch, args.repeat))
+            p95 = durations[min(len(durations) - 1, int(len(durations) * 0.95))]
+            median = statistics.median(durations)
+            print(f"{size:>10} {'yes' if enabled else 'no':>6} {median:>10.2f} {p95:>8.2f}")  # noqa: T201
+        await set_index(True)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        setup(Path(directory) / "bench.db")
+        asyncio.run(main(arguments))
@@ -0,0 +1,218 @@
+"""
+WebSub 本地模拟 hub
+
+在本机启动一个最小的 WebSub hub（同时提供声明该 hub 的订阅源）与加载了插件的 NoneBot，
+依次验证订阅与意图验证、签名正确的推送、签名错误的推送被忽略以及取消订阅。
+不连接聊天平台，推送的消息只记录并打印。
+
+用法:
+    python scripts/websub_hub.py
+"""
+import sys
+import hmac
+import asyncio
+import hashlib
+import tempfile
+from pathlib import Path
+from urllib.parse import parse_qs
+from typing import Any, Dict, List, Tuple, Callable, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from fastapi import FastAPI, Request, Response, BackgroundTasks  # noqa: E402
+
+HOST = "127.0.0.1"
+BOT_PORT = 18080
+HUB_PORT = 18081
+HUB_URL = f"http://{HOST}:{HUB_PORT}/hub"
+TOPIC = f"http://{HOST}:{HUB_PORT}/feed"
+
+
+def render_feed(items: List[int]) -> bytes:
+    """
+    生成声明 hub 与 self 链接的订阅源
+    """
+    entries = "".join(
+        f"<item><title>条目 {i}</title><link>https://example.com/{i}</link><description>内容 {i}</description></item>"
+        for i in items
+    )
+    return (
+        '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom"><channel>'
+        "<title>WebSub 测试</title><link>https://example.com</link><description>本地模拟 hub</description>"
+        f'<atom:link rel="hub" href="{HUB_URL}"/><atom:link rel="self" href="{TOPIC}"/>'
+        f"{entries}</channel></rss>"
+    ).encode()
+
+
+class StandInHub:
+    """
+    最小的 WebSub hub：接受订阅与取消订阅请求，回调验证意图后记录订阅，按订阅的密钥签名推送内容
+    """
+
+    def __init__(self):
+        self.items: List[int] = [1, 2]
+        self.subscriptions: Dict[str, str] = {}
+        """
+        回调地址到密钥的映射
+        """
+        self.verified: List[Tuple[str, str]] = []
+        """
+        已通过验证的请求：模式与回调地址
+        """
+        self.app = FastAPI()
+        self.app.add_api_route("/feed", self.feed, methods=["GET"])
+        self.app.add_api_route("/hub", self.hub, methods=["POST"])
+
+    async def feed(self) -> Response:
+        return Response(render_feed(self.items), media_type="application/rss+xml")
+
+    async def hub(self, request: Request, background: BackgroundTasks) -> Response:
+        form = {key: values[0] for key, values in parse_qs((await request.body()).decode()).items()}
+        if form.get("hub.topic") != TOPIC or form.get("hub.mode") not in {"subscribe", "unsubscribe"}:
+            return Response(status_code=400)
+        background.add_task(self.verify, form)
+        return Response(status_code=202)
+
+    async def verify(self, form: Dict[str, str]) -> None:
+        """
+        向回调地址验证订阅意图，回调原样返回 challenge 时生效
+        """
+        callback, mode = form["hub.callback"], form["hub.mode"]
+        params = {"hub.mode": mode, "hub.topic": TOPIC, "hub.challenge": "challenge-" + mode}
+        if mode == "subscribe":
+            params["hub.lease_seconds"] = form.get("hub.lease_seconds", "3600")
+        url = httpx.URL(callback).copy_merge_params(params)
+        async with httpx.AsyncClient() as client:
+            response = await client.get(url)
+        if response.status_code != 200 or response.text != params["hub.challenge"]:
+            print(f"[hub] {mode} 验证失败：{response.status_code} {response.text!r}")  # noqa: T201
+            return
+        self.verified.append((mode, callback))
+        if mode == "subscribe":
+            self.subscriptions[callback] = form.get("hub.secret", "")
+        else:
+            self.subscriptions.pop(callback, None)
+
+    async def publish(self, item: int, secret: Optional[str] = None) -> List[int]:
+        """
+        添加条目并推送给所有订阅者，`secret` 不为 None 时使用该密钥签名（用于模拟错误签名）
+        """
+        self.items.append(item)
+        content = render_feed([item])
+        status: List[int] = []
+        async with httpx.AsyncClient() as client:
+            for callback, subscriber_secret in self.subscriptions.items():
+                key = subscriber_secret if secret is None else secret
+                signature = "sha256=" + hmac.new(key.encode(), content, hashlib.sha256).hexdigest()
+                response = await client.post(callback, content=content, headers={"X-Hub-Signature": signature})
+                status.append(response.status_code)
+        return status
+
+
+async def wait_for(condition: Callable[[], Any], timeout: float = 10) -> bool:
+    for _ in range(int(timeout * 10)):
+        if condition():
+            return True
+        await asyncio.sleep(0.1)
+    return bool(condition())
+
+
+def check(name: str, passed: bool) -> None:
+    print(f"{'PASS' if passed else 'FAIL'} {name}")  # noqa: T201
+    if not passed:
+        sys.exit(1)
+
+
+async def run(sent: List[str]) -> None:
+    from nonebot import get_driver
+
+    from nonebot_plugin_rss import trigger
+    from nonebot_plugin_rss.models import Rss
+    from nonebot_plugin_rss.websub import websub_subscriber
+
+    hub = StandInHub()
+    # NoneBot 的启动与关闭钩子随 uvicorn 的 lifespan 执行
+    servers = [
+        uvicorn.Server(uvicorn.Config(get_driver().server_app, host=HOST, port=BOT_PORT, log_level="warning")),
+        uvicorn.Server(uvicorn.Config(hub.app, host=HOST, port=HUB_PORT, log_level="warning")),
+    ]
+    tasks = [asyncio.create_task(server.serve()) for server in servers]
+    await wait_for(lambda: all(server.started for server in servers))
+    try:
+        await Rss(name="websub", url=TOPIC, bot_id="stand-in", targets=["stand-in"]).update()
+        rss = await Rss.get_rss("websub")
+        assert rss is not None
+        await trigger.add_job(rss)
+
+        # 首次检查后向 hub 订阅，hub 回调验证意图
+        subscribed = await wait_for(lambda: ("subscribe", websub_subscriber.callback_url(rss)) in hub.verified)
+        check("订阅并通过意图验证", subscribed)
+        job_rss = websub_subscriber._subscribers[rss.id]
+        check("订阅已确认", websub_subscriber.is_active(job_rss))
+
+        # 签名正确的推送进入解析流程
+        status = await hub.publish(3)
+        check("推送被接受", status == [202])
+        check("推送的条目被发送", await wait_for(lambda: any("条目 3" in message for message in sent)))
+
+        # 签名错误的推送被忽略
+        status = await hub.publish(4, secret="wrong-secret")
+        await asyncio.sleep(1)
+        check("错误签名仍返回 202", status == [202])
+        check("错误签名的条目未被发送", not any("条目 4" in message for message in sent))
+
+        # 取消订阅，订阅从数据库删除前 hub 的验证即应通过
+        trigger.delete_job(job_rss)
+        websub_subscriber.unsubscribe(job_rss)
+        unsubscribed = await wait_for(lambda: ("unsubscribe", websub_subscriber.callback_url(rss)) in hub.verified)
+        await job_rss.delete()
+        check("取消订阅并通过意图验证", unsubscribed)
+        check("hub 不再推送", not hub.subscriptions)
+    finally:
+        for server in servers:
+            server.should_exit = True
+        await asyncio.gather(*tasks)
+
+
+def main() -> None:
+    import nonebot
+
+    with tempfile.TemporaryDirectory() as directory:
+        nonebot.init(
+            driver="~fastapi+~httpx",
+            sqlalchemy_database_url=f"sqlite+aiosqlite:///{directory}/websub.db",
+            alembic_startup_check=False,
+            localstore_data_dir=f"{directory}/data",
+            localstore_cache_dir=f"{directory}/cache",
+            localstore_config_dir=f"{directory}/config",
+            rss_websub_callback_base=f"http://{HOST}:{BOT_PORT}",
+            log_level="WARNING",
+        )
+        nonebot.load_plugin("nonebot_plugin_rss")
+
+        from nonebot_plugin_rss import parser, executor
+
+        sent: List[str] = []
+
+        class StandInBot:
+            self_id = "stand-in"
+
+        async def get_bot(bot_id: str) -> StandInBot:
+            return StandInBot()
+
+        async def send_rss(rss: Any, messages: List[Any], title: str) -> bool:
+            sent.extend(str(message) for message in messages)
+            for message in messages:
+                print(f"[bot] {message!s}".replace("\n", " "))  # noqa: T201
+            return True
+
+        # 不连接聊天平台，替换获取 Bot 与发送消息
+        executor.get_bot = get_bot  # type: ignore
+        parser.send_rss = send_rss  # type: ignore
+        asyncio.run(run(sent))
+
+
+if __name__ == "__main__":
+    main()